@@ -0,0 +1,39 @@
+# benchmarks/chart_downsampling.py
+#
+# Builds the daily demand chart of a long synthetic history (several years x
+# several lines) with every point and with LTTB / min-max downsampling, and
+# reports the points sent, the size of the figure JSON and the build time.
+#
+#   python benchmarks/chart_downsampling.py [years] [lines]
+
+import sys, os
+import time
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.downsampling import line_chart
+
+if __name__ == "__main__":
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    dates = pd.date_range('2015-01-01', periods=365 * years, freq='D')
+    rng = np.random.default_rng(0)
+    season = 100 + 30 * np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365.25)
+    df = pd.concat([pd.DataFrame({'Date': dates, 'Units Ordered': season + rng.normal(0, 15, len(dates)).cumsum() / 10,
+                                  'Series': f"S{i:03d}"}) for i in range(lines)], ignore_index=True)
+    print(f"--- Chart downsampling: {years} years x {lines} lines = {len(df):,} points ---")
+
+    def build(name, fn):
+        start = time.perf_counter()
+        fig = fn()
+        payload = fig.to_json()
+        elapsed = time.perf_counter() - start
+        points = sum(len(trace.x) for trace in fig.data)
+        print(f"{name:8s} {points:8,} points  {fig.data[0].type:9s} {len(payload) / 1e6:7.2f} MB  {elapsed * 1000:8.1f} ms")
+
+    px.line(df.head(10), x='Date', y='Units Ordered')  # warm-up, plotly.express imports lazily
+    build('full', lambda: px.line(df, x='Date', y='Units Ordered', color='Series'))
+    build('lttb', lambda: line_chart(df, 'Date', 'Units Ordered', color='Series'))
+    build('minmax', lambda: line_chart(df, 'Date', 'Units Ordered', color='Series', method='minmax'))
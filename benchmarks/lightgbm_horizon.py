@@ -0,0 +1,42 @@
+# benchmarks/lightgbm_horizon.py
+#
+# Times the LightGBM forecast loop for several horizons with the per-day
+# 'recursive' strategy versus the preallocated 'batched' one, on a model
+# trained once, and checks both return the same forecast.
+#
+#   python benchmarks/lightgbm_horizon.py [path/to/sales_data.csv]
+
+import sys, os
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_loader import load_and_clean_data
+from forecast_pipeline_lightgbm import fit_lgbm_model, forecast_lgbm
+
+HORIZONS = [7, 30, 90, 365]
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+if __name__ == "__main__":
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'data/sales_data.csv'
+    print(f"--- LightGBM forecast horizon: {file_path} ---")
+    df = load_and_clean_data(file_path)
+
+    start = time.perf_counter()
+    model, features, state = fit_lgbm_model(df)
+    print(f"training {time.perf_counter() - start:8.2f} s")
+
+    for days in HORIZONS:
+        recursive_time, recursive = best_of(3, lambda: forecast_lgbm(model, features, state, days, 'recursive'))
+        batched_time, batched = best_of(3, lambda: forecast_lgbm(model, features, state, days, 'batched'))
+        same = (recursive['Date'].equals(batched['Date'])
+                and np.allclose(recursive['Predicted Demand'], batched['Predicted Demand'], rtol=0, atol=1e-9))
+        print(f"{days:4d} days   recursive {recursive_time * 1000:9.1f} ms   batched {batched_time * 1000:8.1f} ms"
+              f"   speedup {recursive_time / batched_time:6.1f}x   identical {same}")
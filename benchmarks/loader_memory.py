@@ -0,0 +1,43 @@
+# benchmarks/loader_memory.py
+#
+# Reports peak and resident memory of loading sales_data.csv with default pandas
+# dtypes versus the declared schema in utils.data_loader.
+#
+#   python benchmarks/loader_memory.py [path/to/sales_data.csv]
+
+import sys, os
+import gc
+import time
+import tracemalloc
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.data_loader import load_and_clean_data
+
+def load_default_dtypes(file_path):
+    """The pre-schema loader: default dtypes, dates inferred."""
+    df = pd.read_csv(file_path)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df.sort_values('Date')
+
+def measure(label, loader, file_path):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = loader(file_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resident = df.memory_usage(deep=True).sum()
+    print(f"{label:<16} load {elapsed:8.2f} s   peak {peak / 2**20:10.1f} MiB   resident {resident / 2**20:10.1f} MiB")
+    return df
+
+if __name__ == "__main__":
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'data/sales_data.csv'
+    print(f"--- Loader memory: {file_path} ---")
+    measure("default dtypes", load_default_dtypes, file_path)
+    measure("typed schema", lambda path: load_and_clean_data(path, use_cache=False), file_path)
+    measure("typed + cache", load_and_clean_data, file_path)
+    typed = measure("cache hit", load_and_clean_data, file_path)
+    print("-" * 20)
+    print(typed.dtypes.to_string())
@@ -0,0 +1,48 @@
+# benchmarks/lstm_inference.py
+#
+# Times the recursive LSTM forecast per horizon with the original Keras loop
+# (one model.predict per day) versus the NumPy runtime, for the grand-total
+# series and for all per-store series batched together, and reports the
+# largest difference between the two forecasts.
+#
+#   python benchmarks/lstm_inference.py [path/to/sales_data.csv]
+
+import sys, os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.demand_store import load_daily_demand, load_demand_matrix
+from forecast_pipeline_lstm import predict_future_lstm, predict_future_lstm_many
+
+HORIZONS = [7, 30, 90, 365]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'data/sales_data.csv'
+    print(f"--- LSTM inference: {file_path} ---")
+    series = load_daily_demand(file_path)
+    dates, keys, matrix = load_demand_matrix(file_path, level='store')
+    stores = pd.DataFrame(matrix, index=dates, columns=keys)
+
+    # Warm up the model registry so loading is not timed
+    predict_future_lstm(1, series=series, runtime='keras')
+
+    for days in HORIZONS:
+        keras_time, keras_df = timed(lambda: predict_future_lstm(days, series=series, runtime='keras'))
+        numpy_time, numpy_df = timed(lambda: predict_future_lstm(days, series=series, runtime='numpy'))
+        diff = np.abs(keras_df['Predicted Demand'] - numpy_df['Predicted Demand']).max()
+        print(f"{days:4d} days   1 series    keras {keras_time * 1000:9.1f} ms   numpy {numpy_time * 1000:8.1f} ms"
+              f"   speedup {keras_time / numpy_time:6.1f}x   max diff {diff:.2e}")
+
+    for days in HORIZONS:
+        keras_time, keras_df = timed(lambda: predict_future_lstm_many(stores, days, runtime='keras'))
+        numpy_time, numpy_df = timed(lambda: predict_future_lstm_many(stores, days, runtime='numpy'))
+        diff = np.abs(keras_df.to_numpy() - numpy_df.to_numpy()).max()
+        print(f"{days:4d} days   {stores.shape[1]:2d} series   keras {keras_time * 1000:9.1f} ms   numpy {numpy_time * 1000:8.1f} ms"
+              f"   speedup {keras_time / numpy_time:6.1f}x   max diff {diff:.2e}")
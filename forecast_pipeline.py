@@ -1,17 +1,119 @@
 import joblib
+import numpy as np
 import pandas as pd
 from datetime import timedelta
+from statsmodels.tsa.arima.model import ARIMA
+from utils.data_cache import data_version
+from utils.data_loader import DATA_PATH
+from utils.demand_store import load_daily_demand
+from utils.fitted_models import read_fitted_meta, save_fitted_model
+from utils.forecast_cache import cached_forecast
+from utils.model_registry import artifact_version, get_model
 
-def predict_future_arima(days=7, return_true=False):
-    """
-    Load pre-trained ARIMA model and generate future forecast.
-    """
-    model = joblib.load("models/arima_model.pkl")
+ARIMA_MODEL_PATH = "models/arima_model.pkl"
+
+# Full re-estimation after this many appended days, or when the recent
+# one-step errors exceed DRIFT_RATIO x the in-sample error of the last fit
+REFIT_EVERY_DAYS = 30
+DRIFT_WINDOW = 28
+DRIFT_MIN_DAYS = 7
+DRIFT_RATIO = 2.0
+# Leading residuals skipped, they are dominated by the filter's initialization
+BURN_IN = 10
+
+def _forecast_arima(model, days):
     forecast = model.forecast(steps=days)
     last_date = model.data.dates[-1]
     forecast_dates = pd.date_range(start=last_date + timedelta(days=1), periods=days)
+    return pd.DataFrame({"Date": forecast_dates, "Predicted Demand": forecast})
+
+def fit_arima_model(series, order=(5, 1, 2)):
+    """
+    Fits an ARIMA model on a daily demand Series indexed by date, with the
+    same order train_model.py uses.
+    """
+    return ARIMA(series, order=order).fit()
+
+def _mean_abs_residual(results, last=None):
+    resid = np.asarray(results.resid, dtype=np.float64)[BURN_IN:]
+    if last is not None:
+        resid = resid[-last:]
+    return float(np.mean(np.abs(resid))) if len(resid) else float('nan')
+
+def save_arima_model(results, file_path=DATA_PATH, days_since_refit=0, baseline_mae=None, model_path=ARIMA_MODEL_PATH):
+    """
+    Saves ARIMA results with a sidecar recording the data version, the days
+    appended since the last full fit, and that fit's in-sample MAE.
+    """
+    if baseline_mae is None:
+        baseline_mae = _mean_abs_residual(results)
+    save_fitted_model(model_path, results, data_version(file_path), joblib.dump,
+                      extra={'days_since_refit': days_since_refit, 'baseline_mae': baseline_mae})
 
-    forecast_df = pd.DataFrame({"Date": forecast_dates, "Predicted Demand": forecast})
+def update_arima_model(file_path=DATA_PATH, model_path=ARIMA_MODEL_PATH, refit_every=REFIT_EVERY_DAYS, drift_ratio=DRIFT_RATIO):
+    """
+    Brings the saved ARIMA model up to date with the daily demand.
+
+    New days are added with results.append(refit=False): the estimated
+    parameters are kept and only the state-space filter runs over the new
+    observations, which takes milliseconds. A full re-estimation happens
+    instead when refit_every days have been appended since the last one,
+    when the mean one-step error of the recent days exceeds drift_ratio
+    times the in-sample error of the last fit, or when earlier days changed.
+
+    Returns:
+        A dict with 'action' ('unchanged', 'appended' or 'refit'), 'new_days',
+        'days_since_refit' and 'drift' (recent / baseline error, or None).
+    """
+    results = joblib.load(model_path)
+    meta = read_fitted_meta(model_path)
+    series = load_daily_demand(file_path)
+
+    last_date = results.data.dates[-1]
+    known = series[series.index <= last_date]
+    new = series[series.index > last_date]
+    revised = len(known) != results.nobs or not np.allclose(known.to_numpy(), np.asarray(results.data.endog).ravel())
+
+    if new.empty and not revised:
+        return {'action': 'unchanged', 'new_days': 0, 'days_since_refit': meta.get('days_since_refit', 0), 'drift': None}
+
+    days_since_refit = meta.get('days_since_refit', 0) + len(new)
+    baseline_mae = meta.get('baseline_mae') or _mean_abs_residual(results)
+    drift = None
+    action = 'refit'
+    if not revised and days_since_refit < refit_every:
+        try:
+            updated = results.append(new, refit=False)
+        except (ValueError, KeyError):
+            # e.g. a gap in the dates, which the state-space index cannot extend
+            updated = None
+        if updated is not None:
+            recent = min(days_since_refit, DRIFT_WINDOW)
+            if recent >= DRIFT_MIN_DAYS and baseline_mae:
+                drift = _mean_abs_residual(updated, last=recent) / baseline_mae
+            if drift is None or drift <= drift_ratio:
+                save_arima_model(updated, file_path, days_since_refit, baseline_mae, model_path)
+                action = 'appended'
+
+    if action == 'refit':
+        save_arima_model(fit_arima_model(series), file_path, 0, None, model_path)
+        days_since_refit = 0
+    return {'action': action, 'new_days': len(new), 'days_since_refit': days_since_refit, 'drift': drift}
+
+def predict_future_arima(days=7, return_true=False, series=None):
+    """
+    Load pre-trained ARIMA model and generate future forecast.
+    The model is loaded once per process and shared through the model registry,
+    and shorter horizons are sliced from the longest forecast cached so far.
+    Pass `series` to fit a new model on that series instead (e.g. for backtesting).
+    """
+    if series is None:
+        model = get_model(ARIMA_MODEL_PATH)
+        forecast_df = cached_forecast('arima', artifact_version(ARIMA_MODEL_PATH), data_version(DATA_PATH), days,
+                                      lambda horizon: _forecast_arima(model, horizon))
+    else:
+        model = fit_arima_model(series)
+        forecast_df = _forecast_arima(model, days)
 
     if return_true:
         y_true = model.data.endog[-days:]
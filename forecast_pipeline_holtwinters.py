@@ -1,29 +1,61 @@
+import os
+import joblib
 import pandas as pd
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from datetime import timedelta
+from utils.data_cache import data_version
+from utils.data_loader import DATA_PATH
+from utils.demand_store import load_daily_demand
+from utils.fitted_models import get_fitted_model
+from utils.forecast_cache import cached_forecast
+from utils.model_registry import artifact_version
 
-def predict_future_holtwinters(days=7, return_true=False):
+HOLTWINTERS_MODEL_PATH = os.path.join('models', 'holtwinters_model.pkl')
+
+def fit_holtwinters_model(series):
     """
-    Use Holt-Winters method to forecast future demand.
+    Fits an additive Holt-Winters model with weekly seasonality.
     """
-    df = pd.read_csv("data/sales_data.csv", parse_dates=['Date'])
-    daily = df.groupby('Date')['Units Ordered'].sum().reset_index()
-    daily.set_index('Date', inplace=True)
-
-    model = ExponentialSmoothing(
-        daily['Units Ordered'],
+    return ExponentialSmoothing(
+        series,
         trend='add',
         seasonal='add',
         seasonal_periods=7
     ).fit()
 
-    forecast = model.forecast(days)
-    forecast_dates = pd.date_range(start=daily.index[-1] + timedelta(days=1), periods=days)
+def get_holtwinters_model(file_path=DATA_PATH):
+    """
+    Returns the Holt-Winters model fitted on the current data version of file_path,
+    fitting and saving it to models/ only when the data has changed.
+    """
+    return get_fitted_model(HOLTWINTERS_MODEL_PATH, data_version(file_path),
+                            lambda: fit_holtwinters_model(load_daily_demand(file_path)),
+                            joblib.dump, joblib.load)
+
+def predict_future_holtwinters(days=7, return_true=False, series=None):
+    """
+    Use Holt-Winters method to forecast future demand.
+    `series` is an optional daily demand Series indexed by date; by default the
+    shared demand store's grand-total series is used, with the model persisted
+    per data version and reused for any horizon; its forecasts are cached, so
+    shorter horizons are sliced from the longest one computed so far.
+    """
+    def forecast(horizon):
+        values = model.forecast(horizon)
+        forecast_dates = pd.date_range(start=daily.index[-1] + timedelta(days=1), periods=horizon)
+        return pd.DataFrame({"Date": forecast_dates, "Predicted Demand": values.values})
 
-    df_out = pd.DataFrame({"Date": forecast_dates, "Predicted Demand": forecast.values})
+    if series is None:
+        daily = load_daily_demand()
+        model = get_holtwinters_model()
+        df_out = cached_forecast('holtwinters', artifact_version(HOLTWINTERS_MODEL_PATH), data_version(DATA_PATH), days, forecast)
+    else:
+        daily = series
+        model = fit_holtwinters_model(daily)
+        df_out = forecast(days)
 
     if return_true:
-        y_true = daily['Units Ordered'].values[-days:]
+        y_true = daily.values[-days:]
         return df_out, y_true
 
     return df_out
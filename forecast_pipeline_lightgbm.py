@@ -1,14 +1,23 @@
 # utils/forecast_pipeline_lightgbm.py
 
+import os
+import joblib
 import pandas as pd
 import numpy as np
 import lightgbm as lgb
 from datetime import timedelta
+from utils.model_registry import get_model
+
+# Model trained on the create_features feature set, reused until the data changes
+LGBM_MODEL_PATH = os.path.join('models', 'lightgbm_forecast.pkl')
+LGBM_MODEL_FORMAT = 1
 
 def create_features(df):
     """
     Creates time series features from the date column.
+    Returns a new frame; the columns are added to a shallow copy of df.
     """
+    df = df.copy(deep=False)
     df['dayofweek'] = df['Date'].dt.dayofweek
     df['quarter'] = df['Date'].dt.quarter
     df['month'] = df['Date'].dt.month
@@ -23,13 +32,35 @@ def create_features(df):
     
     return df
 
-def train_and_forecast_lgbm(df, days_to_forecast):
+LAG_FEATURES = ['lag_Units Ordered_1', 'lag_Units Ordered_2', 'lag_Units Ordered_3']
+FORECAST_STRATEGIES = ['batched', 'recursive']
+
+def calendar_features(dates):
     """
-    Trains a LightGBM model and generates a forecast for the specified number of days.
+    Builds the calendar features of create_features for a whole DatetimeIndex at once.
+    """
+    return {
+        'dayofweek': dates.dayofweek.to_numpy(),
+        'quarter': dates.quarter.to_numpy(),
+        'month': dates.month.to_numpy(),
+        'year': dates.year.to_numpy(),
+        'dayofyear': dates.dayofyear.to_numpy(),
+        'dayofmonth': dates.day.to_numpy(),
+        'weekofyear': dates.isocalendar().week.to_numpy().astype(int),
+    }
+
+def fit_lgbm_model(df):
+    """
+    Trains the LightGBM model on the features from create_features.
+
+    Returns:
+        The fitted model, the feature column order, and the forecast state:
+        the last training date and the last three 'Units Ordered' values
+        (most recent first) that seed the lag features.
     """
     df = df.copy()
     df['Date'] = pd.to_datetime(df['Date'])
-    df.sort_values(by='Date', inplace=True)
+    df.sort_values(by='Date', kind='stable', inplace=True)
     df.set_index('Date', inplace=True)
     
     # Create features
@@ -53,20 +84,23 @@ def train_and_forecast_lgbm(df, days_to_forecast):
     model = lgb.LGBMRegressor(objective='regression', metric='rmse')
     model.fit(X, y)
     
-    # Generate the future forecast
-    last_row = df.iloc[-1].copy()
-    last_date = last_row.name
-    
+    last_row = df.iloc[-1]
+    state = {
+        'last_date': last_row.name,
+        'lags': [last_row['Units Ordered'], last_row['lag_Units Ordered_1'], last_row['lag_Units Ordered_2']],
+    }
+    return model, features, state
+
+def _forecast_recursive(model, features, state, days_to_forecast):
+    """
+    One-row DataFrame and model.predict call per forecast day.
+    """
     forecast_list = []
     
     # Initialize lags with the last values from the historical data
-    current_lags = {
-        'lag_Units Ordered_1': last_row['Units Ordered'],
-        'lag_Units Ordered_2': last_row['lag_Units Ordered_1'],
-        'lag_Units Ordered_3': last_row['lag_Units Ordered_2']
-    }
+    current_lags = dict(zip(LAG_FEATURES, state['lags']))
     
-    current_date = last_date
+    current_date = state['last_date']
     
     for _ in range(days_to_forecast):
         current_date += timedelta(days=1)
@@ -101,4 +135,108 @@ def train_and_forecast_lgbm(df, days_to_forecast):
             'Predicted Demand': max(0, prediction) # Ensure no negative predictions
         })
         
-    return pd.DataFrame(forecast_list)
\ No newline at end of file
+    return pd.DataFrame(forecast_list)
+
+def _forecast_batched(model, features, state, days_to_forecast):
+    """
+    Same recursion as _forecast_recursive over one preallocated feature matrix.
+
+    Calendar features for the whole horizon are generated in one vectorized
+    pass; each step only writes three lag cells and calls the raw booster on
+    a row view, with no DataFrame construction or sklearn input validation.
+    """
+    forecast_dates = pd.date_range(start=state['last_date'] + timedelta(days=1), periods=days_to_forecast)
+    calendar = calendar_features(forecast_dates)
+
+    X = np.empty((days_to_forecast, len(features)), dtype=np.float64)
+    for i, feature in enumerate(features):
+        if feature in calendar:
+            X[:, i] = calendar[feature]
+        elif feature not in LAG_FEATURES:
+            raise ValueError(f"Feature '{feature}' cannot be generated for future dates.")
+    lag_cols = [features.index(lag) for lag in LAG_FEATURES]
+
+    booster = model.booster_
+    predictions = np.empty(days_to_forecast, dtype=np.float64)
+    lags = np.array(state['lags'], dtype=np.float64)
+    for step in range(days_to_forecast):
+        X[step, lag_cols] = lags
+        predictions[step] = booster.predict(X[step:step + 1])[0]
+        lags[2], lags[1], lags[0] = lags[1], lags[0], predictions[step]
+
+    return pd.DataFrame({'Date': forecast_dates, 'Predicted Demand': np.maximum(predictions, 0)})
+
+def forecast_lgbm(model, features, state, days_to_forecast, strategy='batched'):
+    """
+    Generates a forecast from a fitted model and its forecast state.
+    strategy is 'batched' (preallocated NumPy arrays) or 'recursive' (per-step DataFrames);
+    both produce the same forecast.
+    """
+    if strategy == 'batched':
+        return _forecast_batched(model, features, state, days_to_forecast)
+    if strategy == 'recursive':
+        return _forecast_recursive(model, features, state, days_to_forecast)
+    raise ValueError(f"Unknown forecast strategy '{strategy}', expected one of {FORECAST_STRATEGIES}.")
+
+def save_lgbm_model(model, features, state, version, model_path=LGBM_MODEL_PATH):
+    """
+    Saves a model from fit_lgbm_model together with the data version it was trained on.
+    """
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    artifact = {
+        'format': LGBM_MODEL_FORMAT,
+        'data_version': version,
+        'features': features,
+        'state': state,
+        'model': model,
+    }
+    joblib.dump(artifact, f"{model_path}.tmp")
+    os.replace(f"{model_path}.tmp", model_path)
+
+def load_lgbm_model(version=None, model_path=LGBM_MODEL_PATH):
+    """
+    Loads the persisted model as (model, features, state).
+    Returns None if there is no model, or it was trained on another data version.
+    """
+    try:
+        artifact = get_model(model_path)
+    except (OSError, EOFError, ValueError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get('format') != LGBM_MODEL_FORMAT:
+        return None
+    if version is not None and artifact['data_version'] != version:
+        return None
+    return artifact['model'], artifact['features'], artifact['state']
+
+def get_lgbm_model(df, version, model_path=LGBM_MODEL_PATH):
+    """
+    Returns the persisted model for this data version, training and saving it first if needed.
+    """
+    fitted = load_lgbm_model(version, model_path)
+    if fitted is None:
+        fitted = fit_lgbm_model(df)
+        save_lgbm_model(*fitted, version, model_path)
+    return fitted
+
+def train_and_forecast_lgbm(df, days_to_forecast, strategy='batched', version=None):
+    """
+    Trains a LightGBM model and generates a forecast for the specified number of days.
+    With a data version (see utils.data_cache.data_version), the model saved for that
+    version is reused, so the model is only retrained when the data changes.
+    """
+    if version is None:
+        model, features, state = fit_lgbm_model(df)
+    else:
+        model, features, state = get_lgbm_model(df, version)
+    return forecast_lgbm(model, features, state, days_to_forecast, strategy)
+
+def forecast_daily_lgbm(series, days_to_forecast, strategy='batched'):
+    """
+    Fits fit_lgbm_model on a daily demand Series indexed by date, one row per
+    day so the lags are the previous days, and forecasts the following days.
+    This daily-total model is the LightGBM scored by the Model Comparison page
+    and the backtests; train_and_forecast_lgbm, used by the LightGBM page,
+    fits on the raw sales rows instead and is not scored there.
+    """
+    daily = pd.DataFrame({'Date': series.index, 'Units Ordered': series.to_numpy()})
+    return forecast_lgbm(*fit_lgbm_model(daily), days_to_forecast, strategy)
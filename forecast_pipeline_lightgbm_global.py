@@ -0,0 +1,183 @@
+# forecast_pipeline_lightgbm_global.py
+
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from utils.data_cache import cache_dir_for, data_version
+from utils.data_loader import DATA_PATH
+from utils.demand_store import KEY_SEPARATOR, load_demand_matrix
+from utils.fitted_models import get_fitted_model, save_fitted_model
+
+GLOBAL_MODEL_PATH = os.path.join('models', 'lightgbm_global.pkl')
+DATASET_FORMAT_VERSION = 1
+
+# Every lag is at least BLOCK days old, so a whole block of days is predicted in one call
+BLOCK = 7
+LAGS = [7, 14, 28]
+ROLLING_WINDOWS = [7, 28]
+CATEGORICAL_FEATURES = ['Store ID', 'Product ID']
+CALENDAR_FEATURES = ['dayofweek', 'month', 'year', 'dayofyear', 'dayofmonth', 'weekofyear']
+FEATURES = (CATEGORICAL_FEATURES + CALENDAR_FEATURES + [f'lag_{lag}' for lag in LAGS]
+            + [f'rolling_mean_{window}_lag_{BLOCK}' for window in ROLLING_WINDOWS])
+# First day with a full feature history
+MIN_HISTORY = max(max(LAGS), BLOCK + max(ROLLING_WINDOWS) - 1)
+
+PARAMS = {
+    'objective': 'regression',
+    'metric': 'rmse',
+    'learning_rate': 0.05,
+    'num_leaves': 63,
+    'min_data_in_leaf': 50,
+    'verbose': -1,
+}
+NUM_BOOST_ROUND = 300
+
+
+def _split_keys(keys):
+    stores, products = zip(*(key.split(KEY_SEPARATOR, 1) for key in keys))
+    return list(stores), list(products)
+
+
+def _feature_matrix(values, cumsum, positions, dates, store_codes, product_codes):
+    """
+    Builds the feature rows of every series for the days at `positions` of the
+    history, day-major: the rows of one day for all series are contiguous.
+
+    `values` is the days x series history (forecasts included once made) and
+    `cumsum` its cumulative sum with a leading row of zeros.
+    """
+    n_days, n_series = len(positions), values.shape[1]
+    X = np.empty((n_days, n_series, len(FEATURES)), dtype=np.float32)
+    X[:, :, 0] = store_codes
+    X[:, :, 1] = product_codes
+
+    calendar = [dates.dayofweek, dates.month, dates.year, dates.dayofyear, dates.day,
+                dates.isocalendar().week.to_numpy().astype(int)]
+    for i, feature in enumerate(calendar, start=len(CATEGORICAL_FEATURES)):
+        X[:, :, i] = np.asarray(feature)[:, None]
+
+    column = len(CATEGORICAL_FEATURES) + len(CALENDAR_FEATURES)
+    for lag in LAGS:
+        X[:, :, column] = values[positions - lag]
+        column += 1
+    for window in ROLLING_WINDOWS:
+        end = positions - BLOCK + 1
+        X[:, :, column] = (cumsum[end] - cumsum[end - window]) / window
+        column += 1
+    return X.reshape(n_days * n_series, len(FEATURES))
+
+
+def _dataset_path(file_path, version):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{name}-lgbm-global{DATASET_FORMAT_VERSION}-{version}.bin")
+
+
+def build_training_dataset(file_path=DATA_PATH):
+    """
+    Returns the lgb.Dataset of all store x product series, loading LightGBM's
+    binary file from data/.cache/ when this data version has been binned
+    before, and building and saving it otherwise.
+
+    Returns:
+        (dataset, stores, products): the category lists map codes back to IDs.
+    """
+    version = data_version(file_path)
+    dates, keys, matrix = load_demand_matrix(file_path, 'store_product')
+    stores, products = _split_keys(keys)
+    store_categories = sorted(set(stores))
+    product_categories = sorted(set(products))
+
+    path = _dataset_path(file_path, version)
+    if os.path.exists(path):
+        return lgb.Dataset(path, params={'verbose': -1}), store_categories, product_categories
+
+    values = np.asarray(matrix, dtype=np.float64)
+    cumsum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    positions = np.arange(MIN_HISTORY, len(dates))
+    store_codes = pd.Categorical(stores, categories=store_categories).codes
+    product_codes = pd.Categorical(products, categories=product_categories).codes
+
+    X = _feature_matrix(values, cumsum, positions, dates[positions], store_codes, product_codes)
+    y = values[positions].ravel()
+    dataset = lgb.Dataset(X, label=y, feature_name=FEATURES, categorical_feature=CATEGORICAL_FEATURES,
+                          params={'verbose': -1}, free_raw_data=True)
+
+    # Drop binned datasets of older data versions, then save this one
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+    for entry in os.listdir(os.path.dirname(path)):
+        if entry.startswith(prefix):
+            try:
+                os.remove(os.path.join(os.path.dirname(path), entry))
+            except OSError:
+                pass
+    dataset.save_binary(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return dataset, store_categories, product_categories
+
+
+def fit_global_lgbm_model(file_path=DATA_PATH):
+    """
+    Trains one LightGBM model on every store x product series, with the store
+    and product as native categorical features instead of one-hot columns.
+    """
+    dataset, stores, products = build_training_dataset(file_path)
+    booster = lgb.train(PARAMS, dataset, num_boost_round=NUM_BOOST_ROUND)
+    return {'booster': booster, 'stores': stores, 'products': products}
+
+
+def train_global_lgbm_model(file_path=DATA_PATH, model_path=GLOBAL_MODEL_PATH):
+    """
+    Trains the global model and saves it to models/ with the data version.
+    """
+    model = fit_global_lgbm_model(file_path)
+    save_fitted_model(model_path, model, data_version(file_path), joblib.dump)
+    return model
+
+
+def get_global_lgbm_model(file_path=DATA_PATH, model_path=GLOBAL_MODEL_PATH):
+    """
+    Returns the global model for the current data version, training it only when the data has changed.
+    """
+    return get_fitted_model(model_path, data_version(file_path), lambda: fit_global_lgbm_model(file_path),
+                            joblib.dump, joblib.load)
+
+
+def forecast_global_lgbm(days=30, file_path=DATA_PATH):
+    """
+    Forecasts every store x product series with the global model.
+
+    The features of all series for a block of 7 days are built at once and
+    scored with a single booster.predict call; predictions are written back
+    into the history so later blocks see them as lags.
+
+    Returns:
+        A DataFrame with Store ID, Product ID, Date and Predicted Demand.
+    """
+    model = get_global_lgbm_model(file_path)
+    dates, keys, matrix = load_demand_matrix(file_path, 'store_product')
+    stores, products = _split_keys(keys)
+    store_codes = pd.Categorical(stores, categories=model['stores']).codes
+    product_codes = pd.Categorical(products, categories=model['products']).codes
+
+    n_history = len(dates)
+    values = np.zeros((n_history + days, len(keys)), dtype=np.float64)
+    values[:n_history] = matrix
+    forecast_dates = pd.date_range(start=dates[-1] + pd.Timedelta(days=1), periods=days)
+
+    for block_start in range(0, days, BLOCK):
+        block_stop = min(block_start + BLOCK, days)
+        positions = np.arange(n_history + block_start, n_history + block_stop)
+        cumsum = np.vstack([np.zeros((1, len(keys))), np.cumsum(values[:positions[-1]], axis=0)])
+        X = _feature_matrix(values, cumsum, positions, forecast_dates[block_start:block_stop], store_codes, product_codes)
+        predictions = model['booster'].predict(X).reshape(len(positions), len(keys))
+        values[positions] = np.maximum(predictions, 0)
+
+    return pd.DataFrame({
+        'Store ID': np.tile(stores, days),
+        'Product ID': np.tile(products, days),
+        'Date': np.repeat(forecast_dates.values, len(keys)),
+        'Predicted Demand': values[n_history:].ravel(),
+    })
@@ -3,29 +3,74 @@ import numpy as np
 import joblib
 from tensorflow.keras.models import load_model
 from datetime import timedelta
+from utils.demand_store import load_daily_demand
+from utils.model_registry import get_model
+from utils.lstm_runtime import forecast_windows, lstm_weights
 
-def predict_future_lstm(days=7, return_true=False):
+WINDOW = 10
+LSTM_RUNTIMES = ['numpy', 'keras']
+LSTM_PATHS = ["models/lstm_model.keras", "models/lstm_scaler.pkl"]
+
+def load_lstm(model_path="models/lstm_model.keras", scaler_path="models/lstm_scaler.pkl"):
     """
-    Load pre-trained LSTM model and scaler to forecast demand.
+    Loads the Keras model and its scaler as one (model, scaler) pair.
     """
-    scaler = joblib.load("models/lstm_scaler.pkl")
-    model = load_model("models/lstm_model.keras")
+    return load_model(model_path), joblib.load(scaler_path)
 
-    df = pd.read_csv("data/sales_data.csv", parse_dates=["Date"])
-    df_daily = df.groupby("Date")["Units Ordered"].sum().reset_index()
-    data = df_daily["Units Ordered"].values.reshape(-1, 1)
-    scaled = scaler.transform(data)
+def load_lstm_runtime(model_path="models/lstm_model.keras", scaler_path="models/lstm_scaler.pkl"):
+    """
+    Loads (model, scaler, weights), where weights is the NumPy copy of the
+    model used by the 'numpy' runtime, or None if the architecture is not supported.
+    """
+    model, scaler = load_lstm(model_path, scaler_path)
+    return model, scaler, lstm_weights(model)
 
-    X_input = scaled[-10:].reshape(1, 10, 1)
+def _forecast_keras(model, windows, days):
+    """
+    The original loop: one model.predict call per forecast day.
+    """
+    X_input = windows[:, :, None]
     predictions = []
-    last_date = df_daily["Date"].max()
-
     for _ in range(days):
-        pred = model.predict(X_input, verbose=0)[0][0]
+        pred = model.predict(X_input, verbose=0)[:, 0]
         predictions.append(pred)
-        X_input = np.append(X_input[:, 1:, :], [[[pred]]], axis=1)
+        X_input = np.append(X_input[:, 1:, :], pred[:, None, None], axis=1)
+    return np.stack(predictions, axis=1)
+
+def _forecast_scaled(windows, days, runtime, network=None):
+    model, scaler, weights = get_model(LSTM_PATHS, load_lstm_runtime) if network is None else network
+    if runtime not in LSTM_RUNTIMES:
+        raise ValueError(f"Unknown LSTM runtime '{runtime}', expected one of {LSTM_RUNTIMES}.")
+    if runtime == 'numpy' and weights is not None:
+        return forecast_windows(weights, windows, days)
+    return _forecast_keras(model, windows, days)
+
+def predict_future_lstm(days=7, return_true=False, series=None, runtime='numpy', network=None):
+    """
+    Load pre-trained LSTM model and scaler to forecast demand.
+    `series` is an optional daily demand Series indexed by date; by default the
+    shared demand store's grand-total series is used.
+    The model and scaler are loaded once per process through the model registry.
+    `network` is an optional (model, scaler) pair to forecast with instead, e.g.
+    one trained by utils.lstm_training.train_lstm on a backtest fold.
+    runtime 'numpy' runs the recursion on a NumPy copy of the weights instead of
+    calling Keras predict once per day; 'keras' keeps the original loop.
+    """
+    if network is None:
+        network = get_model(LSTM_PATHS, load_lstm_runtime)
+    else:
+        network = (*network, lstm_weights(network[0]))
+    _, scaler, _ = network
+
+    if series is None:
+        series = load_daily_demand()
+    data = series.values.reshape(-1, 1)
+    scaled = scaler.transform(data)
 
-    preds_rescaled = scaler.inverse_transform(np.array(predictions).reshape(-1, 1)).flatten()
+    predictions = _forecast_scaled(scaled[-WINDOW:, 0][None, :], days, runtime, network)[0]
+    last_date = series.index.max()
+
+    preds_rescaled = scaler.inverse_transform(predictions.reshape(-1, 1)).flatten()
     forecast_dates = pd.date_range(start=last_date + timedelta(days=1), periods=days)
 
     if return_true:
@@ -33,3 +78,34 @@ def predict_future_lstm(days=7, return_true=False):
         return pd.DataFrame({"Date": forecast_dates, "Predicted Demand": preds_rescaled}), y_true
 
     return pd.DataFrame({"Date": forecast_dates, "Predicted Demand": preds_rescaled})
+
+def _series_scaling(values, scaler):
+    """
+    Per-column (scale, offset) that map each series' own min/max onto the
+    scaler's feature_range, as MinMaxScaler does: scaled = values * scale + offset.
+    """
+    range_min, range_max = scaler.feature_range
+    low, high = values.min(axis=0), values.max(axis=0)
+    # A constant series maps onto the bottom of the range
+    scale = (range_max - range_min) / np.where(high > low, high - low, 1.0)
+    return scale, range_min - low * scale
+
+def predict_future_lstm_many(frame, days=7, runtime='numpy'):
+    """
+    Forecasts every column of a days x series frame (e.g. per-store demand from
+    utils.demand_store.load_demand_matrix) in one batched recursion.
+    The saved scaler is fitted on the grand-total series, so each column is
+    scaled by its own min/max onto the same range before the shared network
+    runs, and the predictions are mapped back the same way.
+    Returns a frame indexed by the forecast dates with one column per series.
+    """
+    _, scaler, _ = get_model(LSTM_PATHS, load_lstm_runtime)
+
+    values = frame.to_numpy(dtype=np.float64)
+    scale, offset = _series_scaling(values, scaler)
+    scaled = values * scale + offset
+
+    predictions = _forecast_scaled(scaled[-WINDOW:].T, days, runtime)
+    preds_rescaled = (predictions.T - offset) / scale
+    forecast_dates = pd.date_range(start=frame.index.max() + timedelta(days=1), periods=days, name='Date')
+    return pd.DataFrame(preds_rescaled, index=forecast_dates, columns=frame.columns)
@@ -1,24 +1,67 @@
+import os
 import pandas as pd
 from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+from utils.data_cache import data_version
+from utils.data_loader import DATA_PATH
+from utils.demand_store import load_daily_demand
+from utils.fitted_models import get_fitted_model
+from utils.forecast_cache import cached_forecast
+from utils.model_registry import artifact_version
 
-def predict_future_prophet(days=7, return_true=False):
+PROPHET_MODEL_PATH = os.path.join('models', 'prophet_model.json')
+
+def dump_prophet_model(model, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(model_to_json(model))
+
+def load_prophet_model(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return model_from_json(f.read())
+
+def fit_prophet_model(series):
     """
-    Build and fit Prophet model for time series forecasting.
+    Fits a Prophet model on a daily demand Series indexed by date.
     """
-    df = pd.read_csv("data/sales_data.csv", parse_dates=['Date'])
-    daily = df.groupby('Date')["Units Ordered"].sum().reset_index()
-    daily = daily.rename(columns={"Date": "ds", "Units Ordered": "y"})
-
+    daily = pd.DataFrame({"ds": series.index, "y": series.values})
     model = Prophet()
     model.fit(daily)
+    return model
+
+def get_prophet_model(file_path=DATA_PATH):
+    """
+    Returns the Prophet model fitted on the current data version of file_path,
+    fitting and saving it to models/ only when the data has changed.
+    """
+    return get_fitted_model(PROPHET_MODEL_PATH, data_version(file_path),
+                            lambda: fit_prophet_model(load_daily_demand(file_path)),
+                            dump_prophet_model, load_prophet_model)
+
+def predict_future_prophet(days=7, return_true=False, series=None):
+    """
+    Build and fit Prophet model for time series forecasting.
+    `series` is an optional daily demand Series indexed by date; by default the
+    shared demand store's grand-total series is used, with the model persisted
+    per data version and reused for any horizon; its forecasts are cached, so
+    shorter horizons are sliced from the longest one computed so far.
+    """
+    def predict(horizon):
+        # yhat of a future date does not depend on the history rows, so only the horizon is predicted
+        future = model.make_future_dataframe(periods=horizon, include_history=False)
+        forecast = model.predict(future)
+        result = forecast[['ds', 'yhat']].tail(horizon)
+        return result.rename(columns={"ds": "Date", "yhat": "Predicted Demand"})
 
-    future = model.make_future_dataframe(periods=days)
-    forecast = model.predict(future)
-    result = forecast[['ds', 'yhat']].tail(days)
-    result = result.rename(columns={"ds": "Date", "yhat": "Predicted Demand"})
+    if series is None:
+        series = load_daily_demand()
+        model = get_prophet_model()
+        result = cached_forecast('prophet', artifact_version(PROPHET_MODEL_PATH), data_version(DATA_PATH), days, predict)
+    else:
+        model = fit_prophet_model(series)
+        result = predict(days)
 
     if return_true:
-        y_true = daily['y'].values[-days:]
+        y_true = series.values[-days:]
         return result, y_true
 
     return result
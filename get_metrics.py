@@ -1,36 +1,48 @@
 # get_metrics.py
-import pandas as pd
-
-# Load the data from the CSV file
-# تأكد من أن اسم الملف هو 'sales_data.csv'
-try:
-    df = pd.read_csv('data\sales_data.csv')
-except FileNotFoundError:
-    print("Error: The file 'sales_data.csv' was not found.")
-    exit()
-
-# Ensure 'Date' column is a datetime object
-df['Date'] = pd.to_datetime(df['Date'])
-
-# --- Calculate the metrics ---
-
-# Daily Demand
-daily_demand = df.groupby('Date')['Units Ordered'].sum()
-avg_daily_demand = daily_demand.mean()
-median_daily_demand = daily_demand.median()
-
-# Product Sales
-product_sales = df.groupby('Product ID')['Units Sold'].sum()
-avg_product_sales = product_sales.mean()
-median_product_sales = product_sales.median()
-
-# Print the results
-print("--- Sales & Demand Metrics ---")
-print(f"Average Daily Demand: {avg_daily_demand:,.2f}")
-print(f"Median Daily Demand: {median_daily_demand:,.2f}")
-print("-" * 20)
-print(f"Average Product Sales: {avg_product_sales:,.2f}")
-print(f"Median Product Sales: {median_product_sales:,.2f}")
-print("-" * 20)
-print(f"Total Unique Products: {df['Product ID'].nunique()}")
-print("-" * 20)
\ No newline at end of file
+#
+# Streams the CSV in chunks, so it also works for files larger than RAM.
+#   python get_metrics.py [--workers N] [--chunk-mb MB] [path/to/sales_data.csv]
+import argparse
+import os
+
+from utils.chunked_loader import DEFAULT_CHUNK_BYTES, aggregate_sales_csv
+
+def main():
+    parser = argparse.ArgumentParser(description="Print sales & demand metrics.")
+    parser.add_argument('file_path', nargs='?', default=os.path.join('data', 'sales_data.csv'))
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes used to parse chunks.")
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_BYTES // 2**20, help="Chunk size in MiB.")
+    args = parser.parse_args()
+
+    # تأكد من أن اسم الملف هو 'sales_data.csv'
+    if not os.path.exists(args.file_path):
+        print("Error: The file 'sales_data.csv' was not found.")
+        exit()
+
+    aggregates = aggregate_sales_csv(args.file_path, chunk_bytes=args.chunk_mb * 2**20, workers=args.workers)
+
+    # --- Calculate the metrics ---
+
+    # Daily Demand
+    daily_demand = aggregates['daily_demand']
+    avg_daily_demand = daily_demand.mean()
+    median_daily_demand = daily_demand.median()
+
+    # Product Sales
+    product_sales = aggregates['product_sales']
+    avg_product_sales = product_sales.mean()
+    median_product_sales = product_sales.median()
+
+    # Print the results
+    print("--- Sales & Demand Metrics ---")
+    print(f"Average Daily Demand: {avg_daily_demand:,.2f}")
+    print(f"Median Daily Demand: {median_daily_demand:,.2f}")
+    print("-" * 20)
+    print(f"Average Product Sales: {avg_product_sales:,.2f}")
+    print(f"Median Product Sales: {median_product_sales:,.2f}")
+    print("-" * 20)
+    print(f"Total Unique Products: {len(product_sales)}")
+    print("-" * 20)
+
+if __name__ == "__main__":
+    main()
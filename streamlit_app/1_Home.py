@@ -7,8 +7,10 @@ import plotly.express as px
 
 # Add parent directory to path to import utility scripts
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from utils.data_loader import load_and_clean_data
-from utils.recommendation_engine import smart_recommendations
+from utils.recommendation_engine import get_recommendation_index, recommend_from_index
+from utils.cube import get_cube, slice_cube
+from utils.demand_store import load_key_totals
+from utils.downsampling import line_chart
 
 # Page configuration
 st.set_page_config(page_title="Sales Dashboard", layout="wide")
@@ -16,24 +18,20 @@ st.set_page_config(page_title="Sales Dashboard", layout="wide")
 st.title("🏡 Sales & Operations Dashboard")
 st.markdown("Welcome to the interactive sales forecasting and analytics system. This dashboard provides a quick overview of your business performance.")
 
-# Load data (cached for performance)
-@st.cache_data
-def get_data():
-    return load_and_clean_data('data/sales_data.csv')
+# Pre-aggregated rollup cube, answers the KPI, filter and chart queries below
+cube = get_cube('data/sales_data.csv')
 
-df = get_data()
-
-if df.empty:
+if cube.empty:
     st.warning("⚠️ Please ensure the 'sales_data.csv' file exists and is not empty.")
     st.stop()
 
 # --- 1. Key Performance Indicators (KPIs) ---
 st.header("Key Performance Indicators (KPIs)")
-total_sales = int(df['Units Sold'].sum())
-avg_daily_demand = round(df.groupby('Date')['Units Ordered'].sum().mean(), 2)
+total_sales = int(cube['Units Sold'].sum())
+avg_daily_demand = round(cube.groupby('Date')['Units Ordered'].sum().mean(), 2)
 
 # التعديل: استخدام 'Product ID' بدلاً من 'Product Name'
-unique_products = df['Product ID'].nunique()
+unique_products = len(load_key_totals('data/sales_data.csv', level='product'))
 
 col1, col2, col3 = st.columns(3)
 col1.metric("Total Units Sold", f"{total_sales:,}")
@@ -44,22 +42,27 @@ col3.metric("Unique Products", unique_products)
 st.header("Quick Insights & Trends")
 st.markdown("Use the slider to filter data by date range.")
 
-# Date filter
-start_date = st.sidebar.date_input("Start Date", df['Date'].min())
-end_date = st.sidebar.date_input("End Date", df['Date'].max())
+# Date and region filters; the cube is sorted by Date
+first_date, last_date = cube['Date'].iloc[[0, -1]]
+start_date = st.sidebar.date_input("Start Date", first_date)
+end_date = st.sidebar.date_input("End Date", last_date)
+all_regions = cube['Region'].cat.categories.tolist()
+regions = st.sidebar.multiselect("Regions", all_regions, default=all_regions)
 
-filtered_df = df[(df['Date'] >= pd.to_datetime(start_date)) & (df['Date'] <= pd.to_datetime(end_date))]
+filtered_df = slice_cube(cube, start_date, end_date, regions=regions)
 
 if filtered_df.empty:
     st.warning("No data available for the selected date range.")
 else:
     # Demand over time
     daily_demand = filtered_df.groupby('Date')['Units Ordered'].sum().reset_index()
-    fig_demand = px.line(daily_demand, x='Date', y='Units Ordered', title='Daily Demand')
+    # Only about one point per pixel is sent to the browser
+    fig_demand = line_chart(daily_demand, 'Date', 'Units Ordered', title='Daily Demand',
+                            x_range=(start_date, end_date))
     st.plotly_chart(fig_demand, use_container_width=True)
 
     # Sales by category
-    category_sales_df = filtered_df.groupby('Category')['Units Sold'].sum().sort_values(ascending=False).reset_index()
+    category_sales_df = filtered_df.groupby('Category', observed=True)['Units Sold'].sum().sort_values(ascending=False).reset_index()
     fig_category = px.bar(category_sales_df, x='Category', y='Units Sold', title='Total Units Sold by Category')
     st.plotly_chart(fig_category, use_container_width=True)
     
@@ -71,7 +74,7 @@ recommendation_date = st.date_input("Select a date to get recommendations", pd.t
 
 if st.button("Generate Quick Recommendations"):
     # التعديل: استدعاء الدالة بشكل صحيح الآن
-    recommendations = smart_recommendations(df, pd.to_datetime(recommendation_date))
+    recommendations = recommend_from_index(get_recommendation_index('data/sales_data.csv'), pd.to_datetime(recommendation_date))
     
     if recommendations:
         st.markdown("Based on the historical data, here are some smart recommendations:")
@@ -6,22 +6,17 @@ import plotly.graph_objects as go
 # إضافة المسار للحصول على الدوال المساعدة
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from forecast_pipeline import predict_future_arima
-from forecast_pipeline_lstm import predict_future_lstm
-from forecast_pipeline_holtwinters import predict_future_holtwinters
-from forecast_pipeline_prophet import predict_future_prophet
-from forecast_pipeline_lightgbm import train_and_forecast_lgbm
-from utils.metrics import calculate_metrics
-from utils.data_loader import load_and_clean_data
+from utils.metrics import METRIC_COLUMNS, evaluate_forecasts, mase_scale
+from utils.demand_store import load_daily_demand
+from utils.model_comparison import MODELS, compare_models
+from utils.backtesting import BACKTEST_MODELS, WINDOWS, backtest_metrics, run_backtest
+from utils.data_service import get_sales_data
 
 # --- بداية التطبيق ---
 st.title("📉 Model Comparison")
 
-@st.cache_data
-def get_data():
-    return load_and_clean_data('data/sales_data.csv')
-    
-df = get_data()
+# The cleaned data is loaded once per data version and shared read-only across sessions
+df = get_sales_data('data/sales_data.csv')
 
 days = st.slider("Select number of forecast days", 7, 365, 30)
 
@@ -29,27 +24,56 @@ if st.button("Compare Models"):
     if df.empty:
         st.warning("⚠️ Data is not available. Please check the data file.")
     else:
-        with st.spinner("Running forecasts for all models..."):
-            arima_df, arima_true = predict_future_arima(days, return_true=True)
-            lstm_df, lstm_true = predict_future_lstm(days, return_true=True)
-            prophet_df, prophet_true = predict_future_prophet(days, return_true=True)
-            holt_df, holt_true = predict_future_holtwinters(days, return_true=True)
-            
-            lgbm_df = train_and_forecast_lgbm(df, days)
-            lgbm_true = df['Demand Forecast'].iloc[-days:]
-
-        arima_mae, arima_rmse = calculate_metrics(arima_true, arima_df["Predicted Demand"])
-        lstm_mae, lstm_rmse = calculate_metrics(lstm_true, lstm_df["Predicted Demand"])
-        prophet_mae, prophet_rmse = calculate_metrics(prophet_true, prophet_df["Predicted Demand"])
-        holt_mae, holt_rmse = calculate_metrics(holt_true, holt_df["Predicted Demand"])
-        lgbm_mae, lgbm_rmse = calculate_metrics(lgbm_true, lgbm_df["Predicted Demand"])
-
-        st.subheader("📊 Model Error Comparison (MAE & RMSE)")
-        comp_df = pd.DataFrame({
-            "Model": ["ARIMA", "Prophet", "Holt-Winters", "LSTM", "LightGBM"],
-            "MAE": [arima_mae, prophet_mae, holt_mae, lstm_mae, lgbm_mae],
-            "RMSE": [arima_rmse, prophet_rmse, holt_rmse, lstm_rmse, lgbm_rmse]
-        })
-        st.dataframe(comp_df.set_index('Model'))
+        # Each model runs in its own worker process; rows appear as they finish
+        st.subheader("📊 Model Error Comparison")
+        scale = mase_scale(load_daily_demand().to_numpy())
+        table = st.empty()
+        progress = st.progress(0.0, text="Running forecasts for all models...")
+        rows = []
+        for finished, result in enumerate(compare_models(days), start=1):
+            if result['error']:
+                st.error(f"❌ {result['model']} failed: {result['error']}")
+            else:
+                predicted = result['forecast']["Predicted Demand"].to_numpy()[None, None, :]
+                metrics = evaluate_forecasts(result['y_true'][None, :], predicted, models=[result['model']], scale=scale)
+                row = metrics.drop(columns='Series').iloc[0].to_dict()
+                peak = result['peak_memory_mb']
+                row["Wall Time (s)"] = round(result['seconds'], 2)
+                row["Peak Memory (MB)"] = round(peak, 1) if peak is not None else None
+                rows.append(row)
+                table.dataframe(pd.DataFrame(rows).set_index('Model'))
+            progress.progress(finished / len(MODELS), text=f"{result['model']} finished ({finished}/{len(MODELS)})")
+        progress.empty()
         
-        st.info("The model with the lowest MAE and RMSE is the most accurate.")
\ No newline at end of file
+        st.info("The model with the lowest MAE and RMSE is the most accurate. MAPE, sMAPE and WAPE are percentages; MASE below 1 beats a naive forecast.")
+        st.caption("Every model is scored on the daily Units Ordered totals. LightGBM here is fitted on those daily totals; the LightGBM page's model is trained on the raw sales rows.")
+
+# --- Rolling-origin backtest ---
+st.markdown("---")
+st.subheader("🔁 Rolling-Origin Backtest")
+st.markdown("Refits each model at several past origins and scores it on the days that followed, so every score is on data the model has not seen. Results are cached, so adding a model only runs that model.")
+
+col1, col2, col3, col4 = st.columns(4)
+bt_horizon = col1.number_input("Horizon (days)", min_value=7, max_value=90, value=30)
+bt_folds = col2.number_input("Folds", min_value=2, max_value=12, value=5)
+bt_window = col3.selectbox("Training window", WINDOWS)
+bt_train_size = col4.number_input("Rolling window (days)", min_value=60, max_value=3650, value=365, disabled=bt_window != 'rolling')
+bt_models = st.multiselect("Models to backtest", BACKTEST_MODELS, default=BACKTEST_MODELS)
+
+if st.button("Run Backtest") and bt_models:
+    with st.spinner("Backtesting models across folds..."):
+        try:
+            result = run_backtest(bt_models, int(bt_horizon), int(bt_folds), window=bt_window,
+                                  train_size=int(bt_train_size) if bt_window == 'rolling' else None)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+
+    for model, error in result['errors'].items():
+        st.error(f"❌ {model} failed: {error}")
+
+    fold_metrics = backtest_metrics(result)
+    st.markdown("**Average error across folds**")
+    st.dataframe(fold_metrics.groupby('Model', sort=False)[METRIC_COLUMNS].mean())
+    with st.expander("Per-fold errors"):
+        st.dataframe(fold_metrics)
@@ -5,13 +5,16 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import joblib
-from statsmodels.tsa.arima.model import ARIMA
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-from tensorflow.keras.callbacks import EarlyStopping
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler
-import lightgbm as lgb
+from utils.demand_store import load_daily_demand
+from forecast_pipeline import ARIMA_MODEL_PATH, fit_arima_model, save_arima_model, update_arima_model
+from utils.lstm_training import train_lstm
+from utils.data_loader import load_and_clean_data
+from utils.data_cache import data_version
+from forecast_pipeline_lightgbm import fit_lgbm_model, save_lgbm_model
+from forecast_pipeline_lightgbm_global import train_global_lgbm_model
+from forecast_pipeline_holtwinters import HOLTWINTERS_MODEL_PATH, fit_holtwinters_model
+from forecast_pipeline_prophet import PROPHET_MODEL_PATH, fit_prophet_model, dump_prophet_model
+from utils.fitted_models import save_fitted_model
 
 st.set_page_config(page_title="📚 Train Models", layout="wide")
 st.title("📚 Train Forecasting Models")
@@ -22,56 +25,52 @@ if not os.path.exists(data_path):
     st.error("❌ sales_data.csv not found in /data folder.")
     st.stop()
 
-df = pd.read_csv(data_path, parse_dates=['Date'])
-df = df.sort_values("Date")
-
-daily_demand = df.groupby("Date")["Units Ordered"].sum()
+daily_demand = load_daily_demand(data_path)
 
 if st.button("🚀 Train Models"):
     with st.spinner("Training ARIMA model..."):
-        arima_model = ARIMA(daily_demand, order=(5, 1, 2))
-        arima_fitted = arima_model.fit()
-        joblib.dump(arima_fitted, "models/arima_model.pkl")
+        save_arima_model(fit_arima_model(daily_demand), data_path)
         st.success("✅ ARIMA model saved.")
 
     with st.spinner("Training LSTM model..."):
-        series = daily_demand.values.reshape(-1, 1)
-        scaler = MinMaxScaler()
-        scaled_series = scaler.fit_transform(series)
-
-        X_lstm, y_lstm = [], []
-        window = 10
-        for i in range(len(scaled_series) - window):
-            X_lstm.append(scaled_series[i:i+window])
-            y_lstm.append(scaled_series[i+window])
-
-        X_lstm, y_lstm = np.array(X_lstm), np.array(y_lstm)
-
-        model_lstm = Sequential([
-            LSTM(64, activation='relu', input_shape=(X_lstm.shape[1], X_lstm.shape[2])),
-            Dense(1)
-        ])
-        model_lstm.compile(optimizer='adam', loss='mse')
-        model_lstm.fit(X_lstm, y_lstm, epochs=30, batch_size=16,
-                       callbacks=[EarlyStopping(patience=5, restore_best_weights=True)])
+        # Windows are strided views streamed in batches, never materialized as a whole
+        model_lstm, scaler = train_lstm([daily_demand.to_numpy()], window=10, epochs=30, batch_size=16)
         model_lstm.save("models/lstm_model.keras")
         joblib.dump(scaler, "models/lstm_scaler.pkl")
         st.success("✅ LSTM model & scaler saved.")
 
-    with st.spinner("Training LightGBM model..."):
-        cat_cols = ['Store ID', 'Product ID', 'Category', 'Region', 'Weather Condition', 'Seasonality']
-        df_encoded = pd.get_dummies(df, columns=cat_cols)
-        features = [col for col in df_encoded.columns if col not in ["Date", "Units Ordered"]]
-        X = df_encoded[features]
-        y = df_encoded["Units Ordered"]
-        X_train, _, y_train, _ = train_test_split(X, y, shuffle=False, test_size=0.2)
+    with st.spinner("Training global LightGBM model..."):
+        # One model over every store x product series, with native categorical IDs
+        train_global_lgbm_model(data_path)
+        st.success("✅ Global LightGBM model saved.")
 
-        model_lgbm = lgb.LGBMRegressor()
-        model_lgbm.fit(X_train, y_train)
-        joblib.dump(model_lgbm, "models/lightgbm_model.pkl")
-        st.success("✅ LightGBM model saved.")
+    with st.spinner("Training LightGBM forecast model..."):
+        # The model the LightGBM forecast page loads, tagged with the data version
+        model_fc, features_fc, state_fc = fit_lgbm_model(load_and_clean_data(data_path))
+        save_lgbm_model(model_fc, features_fc, state_fc, data_version(data_path))
+        st.success("✅ LightGBM forecast model saved.")
+
+    with st.spinner("Fitting Holt-Winters model..."):
+        save_fitted_model(HOLTWINTERS_MODEL_PATH, fit_holtwinters_model(daily_demand), data_version(data_path), joblib.dump)
+        st.success("✅ Holt-Winters model saved.")
+
+    with st.spinner("Fitting Prophet model..."):
+        save_fitted_model(PROPHET_MODEL_PATH, fit_prophet_model(daily_demand), data_version(data_path), dump_prophet_model)
+        st.success("✅ Prophet model saved.")
 
     st.balloons()
     st.success("🎉 All models trained successfully!")
 
-st.info("ℹ️ Prophet and Holt-Winters models do not require training in advance. They are generated dynamically when forecasting.")
+if os.path.exists(ARIMA_MODEL_PATH) and st.button("🔄 Update ARIMA with New Data"):
+    # New days are filtered into the saved model; it is re-estimated on schedule or on drift
+    with st.spinner("Updating ARIMA model..."):
+        update = update_arima_model(data_path)
+    if update['action'] == 'unchanged':
+        st.success("✅ ARIMA model is already up to date.")
+    elif update['action'] == 'appended':
+        st.success(f"✅ Appended {update['new_days']} new days to the ARIMA model "
+                   f"({update['days_since_refit']} days since the last full fit).")
+    else:
+        st.success(f"✅ ARIMA model refitted on all data ({update['new_days']} new days).")
+
+st.info("ℹ️ Prophet and Holt-Winters models are fitted once per version of the data and saved in models/. If they are missing or out of date, they are refitted on the first forecast. The ARIMA model takes new days incrementally and is fully refitted every 30 days or when its errors drift.")
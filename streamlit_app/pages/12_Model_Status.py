@@ -1,9 +1,13 @@
-import os
+import sys, os
 import streamlit as st
+import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import subprocess
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from utils.model_registry import registry_info
+
 st.set_page_config(page_title="📦 Model Status", layout="wide")
 st.title("📦 Model Status Dashboard")
 
@@ -14,7 +18,10 @@ models_info = {
     "ARIMA": "models/arima_model.pkl",
     "LSTM": "models/lstm_model.keras",
     "LSTM Scaler": "models/lstm_scaler.pkl",
-    "LightGBM": "models/lightgbm_model.pkl"
+    "LightGBM (Global)": "models/lightgbm_global.pkl",
+    "LightGBM Forecast": "models/lightgbm_forecast.pkl",
+    "Holt-Winters": "models/holtwinters_model.pkl",
+    "Prophet": "models/prophet_model.json"
 }
 
 # Display status of each model
@@ -29,6 +36,18 @@ for i, (model_name, model_path) in enumerate(models_info.items()):
             st.error(f"❌ {model_name}")
             st.caption("Model not found.")
 
+# Models currently held by the in-process model registry
+st.divider()
+st.subheader("🧠 Models Loaded in Memory")
+loaded = registry_info()
+if loaded:
+    st.dataframe(pd.DataFrame({
+        "Artifact": [", ".join(os.path.relpath(path) for path in entry['paths']) for entry in loaded],
+        "Size (MiB)": [round(entry['bytes'] / 2**20, 2) for entry in loaded],
+    }))
+else:
+    st.caption("No models loaded yet. They are loaded on first use and shared by all sessions.")
+
 # Retrain models (optional button)
 st.divider()
 st.subheader("🔁 Retrain All Models")
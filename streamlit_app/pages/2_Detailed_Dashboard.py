@@ -8,29 +8,41 @@ import plotly.graph_objects as go
 
 # Add parent directory to path to import utility scripts
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from utils.data_loader import load_and_clean_data
 from utils.eda_tools import plot_interactive_demand, category_sales, season_demand_plot
+from utils.partitioned_store import load_sales_partitions
+from utils.cube import get_cube, slice_cube
 
 # Page configuration
 st.set_page_config(page_title="📊 Sales Dashboard", layout="wide")
 st.title("📊 Detailed Sales & Analytics Dashboard")
 st.markdown("Dive deeper into the data with detailed visualizations and trend analysis.")
 
-# Load the dataset (cached for performance)
-@st.cache_data
-def get_data():
-    return load_and_clean_data('data/sales_data.csv')
+# Pre-aggregated rollup cube; the filters and all charts below are answered from it
+cube = get_cube('data/sales_data.csv')
 
-df = get_data()
-
-# Check if DataFrame is empty
-if df.empty:
+# Check if the data is empty
+if cube.empty:
     st.warning("⚠️ Please ensure the 'sales_data.csv' file exists and is not empty.")
     st.stop()
 
+# --- Filters ---
+st.sidebar.header("🔎 Filters")
+# The cube is sorted by Date
+first_date, last_date = cube['Date'].iloc[[0, -1]]
+start_date = st.sidebar.date_input("Start Date", first_date)
+end_date = st.sidebar.date_input("End Date", last_date)
+all_regions = cube['Region'].cat.categories.tolist()
+regions = st.sidebar.multiselect("Regions", all_regions, default=all_regions)
+
+filtered_df = slice_cube(cube, start_date, end_date, regions=regions)
+
+if filtered_df.empty:
+    st.warning("No data available for the selected filters.")
+    st.stop()
+
 # --- 1. Total Units Ordered Over Time ---
 st.header("📈 Total Units Ordered Over Time")
-fig_demand = plot_interactive_demand(df)
+fig_demand = plot_interactive_demand(filtered_df)
 st.plotly_chart(fig_demand, use_container_width=True)
 
 # --- 2. Sales Distribution by Category & Region ---
@@ -38,23 +50,23 @@ st.header("🧺 Sales by Category & Region")
 col1, col2 = st.columns(2)
 with col1:
     st.subheader("Units Sold by Category")
-    category_data = category_sales(df)
+    category_data = category_sales(filtered_df)
     st.bar_chart(category_data)
 
 with col2:
     st.subheader("Units Sold by Region")
-    region_data = df.groupby('Region')['Units Sold'].sum().sort_values(ascending=False)
+    region_data = filtered_df.groupby('Region', observed=True)['Units Sold'].sum().sort_values(ascending=False)
     st.bar_chart(region_data)
 
 # --- 3. Seasonal Demand Analysis ---
 st.header("🍂 Seasonal Demand Analysis")
-fig_season = season_demand_plot(df)
+fig_season = season_demand_plot(filtered_df)
 st.plotly_chart(fig_season, use_container_width=True)
 
 # --- 4. Correlation with Promotions ---
-if 'Holiday/Promotion' in df.columns:
+if 'Holiday/Promotion' in filtered_df.columns:
     st.header("📅 Impact of Holidays & Promotions")
-    promo_df = df.groupby(['Date', 'Holiday/Promotion'])['Units Ordered'].sum().reset_index()
+    promo_df = filtered_df.groupby(['Date', 'Holiday/Promotion'])['Units Ordered'].sum().reset_index()
     fig_promo = go.Figure()
     fig_promo.add_trace(go.Scatter(x=promo_df['Date'], y=promo_df['Units Ordered'],
                                    mode='lines+markers', name='Units Ordered',
@@ -67,4 +79,20 @@ if 'Holiday/Promotion' in df.columns:
                                        marker=dict(color='red', size=10)))
     
     fig_promo.update_layout(title="Daily Demand with Promotions")
-    st.plotly_chart(fig_promo, use_container_width=True)
\ No newline at end of file
+    st.plotly_chart(fig_promo, use_container_width=True)
+
+# --- 5. Filtered Rows ---
+st.header("🧾 Filtered Rows")
+if st.button("Load filtered rows"):
+    # Only the partitions for the selected months are read from disk
+    rows_df = load_sales_partitions(
+        'data/sales_data.csv', start_date, end_date,
+        regions=None if set(regions) == set(all_regions) else regions,
+    )
+    st.dataframe(rows_df)
+    st.download_button(
+        label="Download as CSV",
+        data=rows_df.to_csv(index=False),
+        file_name='filtered_sales.csv',
+        mime='text/csv'
+    )
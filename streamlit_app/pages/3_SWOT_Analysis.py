@@ -7,8 +7,10 @@ from datetime import date, timedelta
 
 # Add parent directory to path to import utility scripts
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from utils.data_loader import load_and_clean_data
+from utils.data_service import get_sales_data
 from utils.swot_pipeline import generate_swot_from_data
+from utils.cube import get_cube
+from utils.demand_store import load_key_totals
 
 # Page configuration
 st.set_page_config(page_title="📄 SWOT Analysis", layout="wide")
@@ -16,12 +18,8 @@ st.title("📄 SWOT Analysis")
 
 st.markdown("This page automatically generates a SWOT analysis based on your sales data. The analysis is based on the entire dataset available.")
 
-# Load the dataset (cached for performance)
-@st.cache_data
-def get_data():
-    return load_and_clean_data('data/sales_data.csv')
-
-df = get_data()
+# The cleaned data is loaded once per data version and shared read-only across sessions
+df = get_sales_data('data/sales_data.csv')
 
 # Check if DataFrame is empty
 if df.empty:
@@ -32,14 +30,14 @@ if df.empty:
 st.subheader("💡 Key Metrics for Analysis")
 st.info("The analysis below uses dynamic thresholds based on these numbers to provide a more detailed output.")
 
-daily_demand = df.groupby('Date')['Units Ordered'].sum()
+daily_demand = get_cube('data/sales_data.csv').groupby('Date')['Units Ordered'].sum()
 avg_daily_demand = round(daily_demand.mean(), 2)
 median_daily_demand = round(daily_demand.median(), 2)
 
-product_sales = df.groupby('Product ID')['Units Sold'].sum()
+product_sales = load_key_totals('data/sales_data.csv', 'product', 'Units Sold')
 avg_product_sales = round(product_sales.mean(), 2)
 median_product_sales = round(product_sales.median(), 2)
-total_unique_products = df['Product ID'].nunique()
+total_unique_products = len(product_sales)
 
 col1, col2 = st.columns(2)
 col1.metric("Average Daily Demand", f"{avg_daily_demand:,}")
@@ -3,10 +3,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 
 import streamlit as st
 import pandas as pd
-from utils.data_loader import load_and_clean_data
-from utils.recommendation_engine import smart_recommendations
+from utils.data_service import get_sales_data
+from utils.recommendation_engine import get_recommendation_index, recommend_from_index
 
-df = load_and_clean_data('data/sales_data.csv')
+df = get_sales_data('data/sales_data.csv')
 
 st.title("📋 Smart Seasonal Recommendations")
 
@@ -14,7 +14,8 @@ if not df.empty:
     selected_date = st.date_input("Choose a date:", df['Date'].min())
 
     if st.button("Generate Recommendations"):
-        recommendations = smart_recommendations(df, pd.to_datetime(selected_date))
+        # The index is built once per data version; each date is answered from it
+        recommendations = recommend_from_index(get_recommendation_index('data/sales_data.csv'), pd.to_datetime(selected_date))
         for rec in recommendations:
             st.success(rec)
 else:
@@ -3,13 +3,15 @@
 import sys, os
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import date, timedelta
 
 # Add parent directory to path to import utility scripts
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from utils.data_loader import load_and_clean_data
-from forecast_pipeline_lightgbm import train_and_forecast_lgbm
+from utils.data_service import get_sales_data
+from utils.data_cache import data_version
+from forecast_pipeline_lightgbm import FORECAST_STRATEGIES, train_and_forecast_lgbm
+from forecast_pipeline_lightgbm_global import forecast_global_lgbm
+from utils.downsampling import line_chart
 
 # Page configuration
 st.set_page_config(page_title="🗓️ LightGBM Forecast", layout="wide")
@@ -17,12 +19,9 @@ st.title("🗓️ LightGBM Demand Forecast")
 
 st.markdown("This page uses a LightGBM model to predict future demand based on your historical data. It analyzes sales patterns, seasonality, and other factors to provide a detailed forecast.")
 
-# Load the dataset (cached for performance)
-@st.cache_data
-def get_data():
-    return load_and_clean_data('data/sales_data.csv')
-
-df = get_data()
+version = data_version('data/sales_data.csv')
+# The cleaned data is loaded once per data version and shared read-only across sessions
+df = get_sales_data('data/sales_data.csv')
 
 if df.empty:
     st.warning("⚠️ Please ensure the 'sales_data.csv' file exists and is not empty.")
@@ -33,13 +32,15 @@ st.markdown("---")
 # User inputs
 st.sidebar.header("📊 Forecast Settings")
 days_to_forecast = st.sidebar.slider("Select number of days to forecast:", 7, 90, 365)
+strategy = st.sidebar.selectbox("Forecast strategy:", FORECAST_STRATEGIES,
+                                help="'batched' fills preallocated arrays and is much faster on long horizons; 'recursive' is the original per-day loop. Both give the same forecast.")
 run_forecast = st.sidebar.button("Run Forecast")
 
 # Initial data visualization
 if not run_forecast:
     st.subheader("Historical Daily Demand")
     daily_demand = df.groupby('Date')['Units Ordered'].sum().reset_index()
-    fig = px.line(daily_demand, x='Date', y='Units Ordered', title='Historical Daily Demand')
+    fig = line_chart(daily_demand, 'Date', 'Units Ordered', title='Historical Daily Demand')
     fig.update_layout(xaxis_title="Date", yaxis_title="Units Ordered")
     st.plotly_chart(fig, use_container_width=True)
 
@@ -47,9 +48,9 @@ if not run_forecast:
 if run_forecast:
     st.info(f"🔮 Generating a {days_to_forecast}-day demand forecast using LightGBM...")
     
-    with st.spinner('Training model and forecasting...'):
+    with st.spinner('Forecasting (the model is retrained only when the data has changed)...'):
         try:
-            forecast_df = train_and_forecast_lgbm(df, days_to_forecast)
+            forecast_df = train_and_forecast_lgbm(df, days_to_forecast, strategy=strategy, version=version)
             
             st.success("✅ Forecast generated successfully!")
             
@@ -62,9 +63,9 @@ if run_forecast:
             
             combined_df = pd.concat([historical_demand, forecast_df])
             
-            # Plotting the combined data
-            fig = px.line(combined_df, x='Date', y='Units Ordered', color='Type',
-                          title=f'Daily Demand: Historical vs. {days_to_forecast}-Day Forecast')
+            # Plotting the combined data, downsampled per line
+            fig = line_chart(combined_df, 'Date', 'Units Ordered', color='Type',
+                             title=f'Daily Demand: Historical vs. {days_to_forecast}-Day Forecast')
             fig.update_layout(xaxis_title="Date", yaxis_title="Units Ordered")
             
             st.plotly_chart(fig, use_container_width=True)
@@ -83,4 +84,26 @@ if run_forecast:
             )
             
         except Exception as e:
-            st.error(f"An error occurred during forecasting: {e}")
\ No newline at end of file
+            st.error(f"An error occurred during forecasting: {e}")
+
+# Per-series forecast from the global model
+st.markdown("---")
+st.subheader("🏬 Store × Product Forecast (Global Model)")
+st.markdown("A single LightGBM model trained on every store × product series, with the store and product as categorical features, forecasts all series at once.")
+
+if st.button("Forecast All Store × Product Series"):
+    with st.spinner('Forecasting every store × product series (the model is retrained only when the data has changed)...'):
+        try:
+            series_forecast = forecast_global_lgbm(days_to_forecast)
+            totals = (series_forecast.groupby(['Store ID', 'Product ID'])['Predicted Demand'].sum()
+                      .rename(f'Predicted Demand ({days_to_forecast} days)').reset_index()
+                      .sort_values(f'Predicted Demand ({days_to_forecast} days)', ascending=False))
+            st.write(totals)
+            st.download_button(
+                label="Download Store × Product Forecast as CSV",
+                data=series_forecast.to_csv(index=False),
+                file_name=f'lightgbm_store_product_forecast_{date.today()}.csv',
+                mime='text/csv'
+            )
+        except Exception as e:
+            st.error(f"An error occurred during forecasting: {e}")
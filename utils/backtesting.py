@@ -0,0 +1,212 @@
+# utils/backtesting.py
+#
+# Rolling-origin backtests of the forecasting models on daily demand.
+#   python -m utils.backtesting [--models ARIMA Holt-Winters] [--horizon 30] [--folds 5]
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils.data_cache import cache_dir_for
+from utils.data_loader import DATA_PATH
+from utils.demand_store import load_daily_demand
+from utils.metrics import METRIC_COLUMNS, evaluate_forecasts, mase_scale
+
+BACKTEST_FORMAT = 2
+BACKTEST_MODELS = ['ARIMA', 'Holt-Winters', 'Prophet', 'LightGBM', 'LSTM']
+WINDOWS = ['expanding', 'rolling']
+
+
+def fold_origins(n_obs, horizon, folds, step=None, min_train=None):
+    """
+    Returns the positions where each fold's training data ends (exclusive).
+    The last fold's forecast ends on the last observation, and earlier folds
+    step back by `step` days (default: the horizon, so test windows do not overlap).
+    """
+    step = step or horizon
+    min_train = min_train or 2 * horizon
+    origins = [n_obs - horizon - step * k for k in range(folds)][::-1]
+    if origins[0] < min_train:
+        raise ValueError(f"Not enough data for {folds} folds of {horizon} days: the first fold would train on {origins[0]} days.")
+    return origins
+
+
+def forecast_fold(model, train, horizon):
+    """
+    Fits `model` on the training Series and returns its `horizon` predictions.
+
+    Every model is refitted on every fold; the LSTM trains a fresh network and
+    scaler on the fold's training data with the settings of train_model.py.
+    LightGBM is the daily-total model of forecast_daily_lgbm, not the row-level
+    model of the LightGBM page.
+    """
+    if model == 'ARIMA':
+        from forecast_pipeline import predict_future_arima
+        forecast = predict_future_arima(horizon, series=train)
+    elif model == 'Holt-Winters':
+        from forecast_pipeline_holtwinters import predict_future_holtwinters
+        forecast = predict_future_holtwinters(horizon, series=train)
+    elif model == 'Prophet':
+        from forecast_pipeline_prophet import predict_future_prophet
+        forecast = predict_future_prophet(horizon, series=train)
+    elif model == 'LightGBM':
+        from forecast_pipeline_lightgbm import forecast_daily_lgbm
+        forecast = forecast_daily_lgbm(train, horizon)
+    elif model == 'LSTM':
+        from forecast_pipeline_lstm import WINDOW, predict_future_lstm
+        from utils.lstm_training import train_lstm
+        network = train_lstm([train.to_numpy()], window=WINDOW, verbose=0)
+        forecast = predict_future_lstm(horizon, series=train, network=network)
+    else:
+        raise ValueError(f"Unknown model '{model}', expected one of {BACKTEST_MODELS}.")
+    return np.asarray(forecast['Predicted Demand'], dtype=np.float64)
+
+
+def _run_fold(model, fold, train, horizon):
+    try:
+        return model, fold, forecast_fold(model, train, horizon), None
+    except Exception as e:
+        traceback.print_exc()
+        return model, fold, None, f"{type(e).__name__}: {e}"
+
+
+def _fold_cache_path(file_path, model, spec):
+    name = f"{model.replace('-', '').replace(' ', '')}-{spec}-b{BACKTEST_FORMAT}.npy"
+    return os.path.join(cache_dir_for(file_path), 'backtests', name)
+
+
+def run_backtest(models=None, horizon=30, folds=5, step=None, window='expanding', train_size=None,
+                 workers=None, series=None, file_path=DATA_PATH, use_cache=True):
+    """
+    Backtests models over several forecast origins.
+
+    Every (model, fold) pair is an independent task, run in parallel on a
+    pool of worker processes. The predictions of each model are cached on
+    disk per data and fold layout, so adding a model to a comparison only
+    runs the new model's folds.
+
+    Args:
+        models: Model names from BACKTEST_MODELS, all of them by default.
+        horizon: Days forecast from each origin.
+        folds: Number of origins.
+        step: Days between origins, the horizon by default.
+        window: 'expanding' trains on all data before the origin; 'rolling'
+            trains on the last train_size days only.
+        train_size: Training window of the rolling scheme, and the minimum
+            training length of the expanding one.
+        workers: Worker processes, all cores by default.
+        series: Daily demand Series to backtest on, the grand total of file_path by default.
+        file_path: Data file, used for the default series and for the cache location.
+        use_cache: Read and write the fold cache.
+
+    Returns:
+        A dict with 'origins' (last training date of each fold), 'actuals'
+        (folds x horizon), 'predictions' (model -> folds x horizon, NaN where a
+        fold failed), 'scale' (MASE scale of each fold's training data) and
+        'errors' (model -> first error message).
+    """
+    models = models or BACKTEST_MODELS
+    if window not in WINDOWS:
+        raise ValueError(f"Unknown window '{window}', expected one of {WINDOWS}.")
+    if window == 'rolling' and not train_size:
+        raise ValueError("A rolling window needs a train_size.")
+    if series is None:
+        series = load_daily_demand(file_path)
+
+    values = np.asarray(series, dtype=np.float64)
+    origins = fold_origins(len(values), horizon, folds, step, train_size)
+    starts = [origin - train_size if window == 'rolling' else 0 for origin in origins]
+    actuals = np.stack([values[origin:origin + horizon] for origin in origins])
+
+    # The cache key covers the data itself and the fold layout
+    digest = hashlib.sha256(values.tobytes())
+    digest.update(series.index.values.astype('datetime64[ns]').tobytes())
+    spec = f"{digest.hexdigest()[:16]}-{window}-h{horizon}-o{origins[0]}-s{step or horizon}-f{folds}-t{train_size or 0}"
+
+    predictions, errors, pending = {}, {}, []
+    for model in models:
+        path = _fold_cache_path(file_path, model, spec)
+        if use_cache and os.path.exists(path):
+            try:
+                predictions[model] = np.load(path)
+                continue
+            except (OSError, ValueError):
+                pass
+        predictions[model] = np.full((folds, horizon), np.nan)
+        pending.append((model, path))
+
+    if pending:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+            futures = []
+            for model, _ in pending:
+                for fold, (start, origin) in enumerate(zip(starts, origins)):
+                    futures.append(pool.submit(_run_fold, model, fold, series.iloc[start:origin], horizon))
+            for future in as_completed(futures):
+                model, fold, forecast, error = future.result()
+                if error is not None:
+                    errors.setdefault(model, error)
+                else:
+                    predictions[model][fold] = forecast[:horizon]
+
+        for model, path in pending:
+            if use_cache and model not in errors:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                np.save(path, predictions[model])
+
+    return {
+        'origins': series.index[np.array(origins) - 1],
+        'actuals': actuals,
+        'scale': mase_scale([values[start:origin] for start, origin in zip(starts, origins)]),
+        'predictions': predictions,
+        'errors': errors,
+    }
+
+
+def backtest_metrics(result):
+    """
+    Scores a run_backtest result in one vectorized pass over models x folds x horizon.
+
+    Returns:
+        A tidy DataFrame with one row per model and fold (Model, Fold, Origin
+        and the utils.metrics columns), NaN for folds that failed.
+    """
+    models = list(result['predictions'])
+    predicted = np.stack([result['predictions'][model] for model in models])
+    n_folds = len(result['origins'])
+    metrics = evaluate_forecasts(result['actuals'], predicted, models=models,
+                                 series=np.arange(1, n_folds + 1), scale=result['scale'])
+    metrics = metrics.rename(columns={'Series': 'Fold'})
+    metrics.insert(2, 'Origin', np.tile(result['origins'], len(models)))
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the forecasting models.")
+    parser.add_argument('--models', nargs='+', default=BACKTEST_MODELS, choices=BACKTEST_MODELS)
+    parser.add_argument('--horizon', type=int, default=30, help="Days forecast from each origin.")
+    parser.add_argument('--folds', type=int, default=5, help="Number of forecast origins.")
+    parser.add_argument('--step', type=int, default=None, help="Days between origins (default: the horizon).")
+    parser.add_argument('--window', choices=WINDOWS, default='expanding')
+    parser.add_argument('--train-size', type=int, default=None, help="Training days of the rolling window.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument('--data', default=DATA_PATH, help="Data file to backtest on.")
+    args = parser.parse_args()
+
+    result = run_backtest(args.models, args.horizon, args.folds, args.step, args.window, args.train_size,
+                          args.workers, file_path=args.data)
+    metrics = backtest_metrics(result)
+    print(metrics.to_string(index=False))
+    print("-" * 20)
+    print(metrics.groupby('Model', sort=False)[METRIC_COLUMNS].mean().to_string())
+    for model, error in result['errors'].items():
+        print(f"{model} failed: {error}")
+
+
+if __name__ == "__main__":
+    main()
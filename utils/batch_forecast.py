@@ -0,0 +1,208 @@
+# utils/batch_forecast.py
+#
+# Forecasts every store x product (or store, product, category) series.
+#   python -m utils.batch_forecast --model Holt-Winters --days 30 [--level store_product] [--workers 4]
+
+import argparse
+import glob
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.backtesting import BACKTEST_MODELS, forecast_fold
+from utils.data_cache import cache_dir_for, data_version
+from utils.data_loader import DATA_PATH
+from utils.demand_store import KEY_SEPARATOR, LEVEL_KEYS, level_columns, load_demand_matrix
+
+DEFAULT_CHUNK_SIZE = 25
+
+
+def _run_dir(file_path, model, level, days, chunk_size):
+    name = f"batch-{model.replace('-', '').replace(' ', '')}-{level}-h{days}-c{chunk_size}-{data_version(file_path)}"
+    return os.path.join(cache_dir_for(file_path), name)
+
+
+def _part_path(run_dir, chunk):
+    return os.path.join(run_dir, f"part-{chunk:05d}.parquet")
+
+
+def forecast_chunk(model, days, level, chunk, start, stop, run_dir, file_path=DATA_PATH):
+    """
+    Forecasts the series in columns start:stop of a level's demand matrix and
+    writes them to the chunk's part file, which doubles as its checkpoint.
+
+    A series that fails is recorded with its error message instead of
+    stopping the chunk.
+
+    Returns:
+        (forecasted series, failed series) of the chunk.
+    """
+    dates, keys, matrix = load_demand_matrix(file_path, level)
+    # A daily frequency on the index keeps statsmodels from warning about it for every series
+    daily = pd.date_range(dates[0], dates[-1], freq='D')
+    values = matrix[:, start:stop]
+    if len(daily) != len(dates):
+        # Days without any sales rows have no demand
+        values = pd.DataFrame(values, index=dates).reindex(daily, fill_value=0).to_numpy()
+    batched = None
+    if model == 'LSTM':
+        # The saved network forecasts the whole chunk in one batched recursion,
+        # each series scaled by its own range
+        from forecast_pipeline_lstm import predict_future_lstm_many
+        try:
+            batched, batch_error = predict_future_lstm_many(pd.DataFrame(values, index=daily), days).to_numpy(), None
+        except Exception as e:
+            batched, batch_error = np.full((days, stop - start), np.nan), f"{type(e).__name__}: {e}"
+
+    series_keys, forecast_dates, predictions, errors = [], [], [], []
+    failed = 0
+    for col in range(start, stop):
+        if batched is not None:
+            forecast, error = batched[:, col - start], batch_error
+        else:
+            series = pd.Series(values[:, col - start], index=daily, name='Units Ordered')
+            try:
+                forecast = forecast_fold(model, series, days)
+                error = None
+            except Exception as e:
+                forecast, error = np.full(days, np.nan), f"{type(e).__name__}: {e}"
+        if error is not None:
+            failed += 1
+        series_keys.extend([keys[col]] * days)
+        forecast_dates.append(pd.date_range(start=dates[-1] + pd.Timedelta(days=1), periods=days).values)
+        predictions.append(forecast[:days])
+        errors.extend([error] * days)
+
+    table = pa.table({
+        'Key': pa.array(series_keys, type=pa.string()),
+        'Date': pa.array(np.concatenate(forecast_dates)),
+        'Predicted Demand': pa.array(np.concatenate(predictions), type=pa.float64()),
+        'Error': pa.array(errors, type=pa.string()),
+    })
+    path = _part_path(run_dir, chunk)
+    pq.write_table(table, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return stop - start - failed, failed
+
+
+def batch_forecast(model, days=30, level='store_product', workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                   file_path=DATA_PATH, output_path=None, progress=None):
+    """
+    Forecasts every series of a demand-store level with one of the model
+    families, fanned out over a process pool.
+
+    Series are split into fixed chunks of `chunk_size` columns, so the work
+    per task is coarse enough to amortize process start-up and model
+    imports. Each finished chunk is saved as a Parquet part file under
+    data/.cache/; an interrupted run with the same model, level, horizon,
+    chunk size and data version resumes from the chunks already written.
+
+    Args:
+        model: One of BACKTEST_MODELS; every series gets its own fit, except
+            with LSTM, where the saved network forecasts each chunk in one batch.
+        days: Forecast horizon.
+        level: Demand store level, 'store_product' by default.
+        workers: Worker processes, all cores by default.
+        chunk_size: Series per task.
+        file_path: The data file.
+        output_path: Where to write the combined Parquet file, if anywhere.
+        progress: Optional callback(done_chunks, total_chunks).
+
+    Returns:
+        A DataFrame with the level's key column(s), Date, Predicted Demand and
+        Error (None unless that series failed; its predictions are then NaN).
+    """
+    if model not in BACKTEST_MODELS:
+        raise ValueError(f"Unknown model '{model}', expected one of {BACKTEST_MODELS}.")
+    if level not in LEVEL_KEYS:
+        raise ValueError(f"Unknown level '{level}', expected one of {list(LEVEL_KEYS)}.")
+
+    _, keys, _ = load_demand_matrix(file_path, level)
+    run_dir = _run_dir(file_path, model, level, days, chunk_size)
+    os.makedirs(run_dir, exist_ok=True)
+
+    chunks = [(start, min(start + chunk_size, len(keys))) for start in range(0, len(keys), chunk_size)]
+    pending = [chunk for chunk in range(len(chunks)) if not os.path.exists(_part_path(run_dir, chunk))]
+    done = len(chunks) - len(pending)
+    if progress:
+        progress(done, len(chunks))
+
+    if pending:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context) as pool:
+            futures = [pool.submit(forecast_chunk, model, days, level, chunk, *chunks[chunk], run_dir, file_path)
+                       for chunk in pending]
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                if progress:
+                    progress(done, len(chunks))
+
+    table = pa.concat_tables([pq.read_table(_part_path(run_dir, chunk)) for chunk in range(len(chunks))])
+    result = table.to_pandas()
+    columns = level_columns(level)
+    if len(columns) > 1:
+        parts = result['Key'].str.split(KEY_SEPARATOR, n=len(columns) - 1, expand=True)
+        for i, col in enumerate(columns):
+            result.insert(i, col, parts[i])
+    else:
+        result.insert(0, columns[0], result['Key'])
+    result = result.drop(columns='Key')
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        result.to_parquet(output_path, index=False)
+        # The combined output is written, so the checkpoints are no longer needed
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    # Drop checkpoints of older data versions for the same job
+    prefix = os.path.basename(run_dir).rsplit('-', 1)[0] + '-'
+    for entry in glob.glob(os.path.join(os.path.dirname(run_dir), f"{glob.escape(prefix)}*")):
+        if entry != run_dir:
+            shutil.rmtree(entry, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast every store x product series with one model family.")
+    parser.add_argument('--model', choices=BACKTEST_MODELS, default='Holt-Winters')
+    parser.add_argument('--days', type=int, default=30, help="Forecast horizon.")
+    parser.add_argument('--level', choices=list(LEVEL_KEYS), default='store_product')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Series per task.")
+    parser.add_argument('--data', default=DATA_PATH, help="Data file to forecast from.")
+    parser.add_argument('--out', default=None, help="Output Parquet file (default: data/forecasts/<model>-<level>-<days>d.parquet).")
+    args = parser.parse_args()
+
+    output_path = args.out or os.path.join(os.path.dirname(args.data), 'forecasts',
+                                           f"{args.model.lower()}-{args.level}-{args.days}d.parquet")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} chunks", end='', flush=True)
+
+    start = time.perf_counter()
+    result = batch_forecast(args.model, args.days, args.level, args.workers, args.chunk_size,
+                            args.data, output_path, progress)
+    print()
+
+    failed = result.loc[result['Error'].notna()].drop_duplicates(subset=level_columns(args.level))
+    n_series = len(result) // args.days if args.days else 0
+    print(f"Forecast {n_series - len(failed):,} of {n_series:,} series in {time.perf_counter() - start:.1f} s -> {output_path}")
+    for _, row in failed.head(10).iterrows():
+        print(f"  {KEY_SEPARATOR.join(str(row[col]) for col in level_columns(args.level))}: {row['Error']}")
+    if len(failed) > 10:
+        print(f"  ... and {len(failed) - 10} more failures")
+    if len(failed) == n_series:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
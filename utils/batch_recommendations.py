@@ -0,0 +1,162 @@
+# utils/batch_recommendations.py
+#
+# Recommendations for a grid of dates x stores or regions.
+#   python -m utils.batch_recommendations [--start 2024-01-01] [--periods 13] [--freq W] [--levels store region]
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data_cache import data_version
+from utils.data_loader import DATA_PATH, load_and_clean_data
+from utils.recommendation_engine import build_recommendation_index, recommend_from_index
+
+# Partition column of each level; 'all' is the whole business, as on the Home page
+LEVEL_COLUMNS = {'all': None, 'store': 'Store ID', 'region': 'Region'}
+
+
+def recommendation_dates(start=None, periods=13, freq='W', file_path=DATA_PATH):
+    """
+    Returns the dates of a recommendation grid: `periods` dates `freq` apart,
+    starting the day after the last sales date by default (a quarter of weeks).
+    """
+    if start is None:
+        start = load_and_clean_data(file_path)['Date'].max() + pd.Timedelta(days=1)
+    return pd.date_range(start=pd.Timestamp(start), periods=periods, freq=freq)
+
+
+def recommend_partitions(partitions, dates, file_path=DATA_PATH):
+    """
+    Builds the recommendation index of each (level, key) partition and answers
+    every date from it. The data is loaded once, and each level's rows are
+    split with a single groupby.
+
+    Returns:
+        A dict of equal-length lists: Level, Key, Date, Rank and Recommendation,
+        in the order of `partitions`.
+    """
+    df = load_and_clean_data(file_path)
+    groups = {}
+    rows = {'Level': [], 'Key': [], 'Date': [], 'Rank': [], 'Recommendation': []}
+    for level, key in partitions:
+        column = LEVEL_COLUMNS[level]
+        if column is None:
+            partition = df
+        else:
+            if level not in groups:
+                groups[level] = df.groupby(column, observed=True)
+            partition = groups[level].get_group(key)
+        index = build_recommendation_index(partition)
+        for date in dates:
+            recommendations = recommend_from_index(index, date)
+            rows['Level'].extend([level] * len(recommendations))
+            rows['Key'].extend([str(key)] * len(recommendations))
+            rows['Date'].extend([date] * len(recommendations))
+            rows['Rank'].extend(range(1, len(recommendations) + 1))
+            rows['Recommendation'].extend(recommendations)
+    return rows
+
+
+def batch_recommendations(dates, levels=('store', 'region'), workers=None, file_path=DATA_PATH,
+                          output_path=None, progress=None):
+    """
+    Generates smart_recommendations() for every date x partition of the given
+    levels; the partition of a store or region holds only its own rows.
+
+    The partitions are split into one contiguous chunk per worker process.
+    Each worker loads the data once, and each partition's index is built
+    once and answers all of its dates.
+
+    Args:
+        dates: Dates to recommend for.
+        levels: Any of LEVEL_COLUMNS.
+        workers: Worker processes, all cores by default.
+        file_path: The data file.
+        output_path: Where to write the result as Parquet, if anywhere.
+        progress: Optional callback(done_partitions, total_partitions).
+
+    Returns:
+        A DataFrame with Level, Key, Date, Rank and Recommendation, one row per
+        recommendation, sorted by level, key and date.
+    """
+    for level in levels:
+        if level not in LEVEL_COLUMNS:
+            raise ValueError(f"Unknown level '{level}', expected one of {list(LEVEL_COLUMNS)}.")
+    dates = list(pd.DatetimeIndex(dates))
+
+    df = load_and_clean_data(file_path)
+    partitions = []
+    for level in levels:
+        column = LEVEL_COLUMNS[level]
+        keys = ['All'] if column is None else sorted(df[column].dropna().unique(), key=str)
+        partitions.extend((level, key) for key in keys)
+    del df
+
+    workers = workers or os.cpu_count()
+    chunks = [[partitions[i] for i in chunk]
+              for chunk in np.array_split(np.arange(len(partitions)), min(workers, len(partitions))) if len(chunk)]
+    parts = {}
+    done = 0
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(recommend_partitions, chunk, dates, file_path): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            parts[futures[future]] = future.result()
+            done += len(chunks[futures[future]])
+            if progress:
+                progress(done, len(partitions))
+
+    columns = {name: [] for name in ['Level', 'Key', 'Date', 'Rank', 'Recommendation']}
+    for i in range(len(chunks)):
+        for name, values in parts[i].items():
+            columns[name].extend(values)
+    table = pa.table({
+        'Level': pa.array(columns['Level'], type=pa.string()).dictionary_encode(),
+        'Key': pa.array(columns['Key'], type=pa.string()).dictionary_encode(),
+        'Date': pa.array(np.array(columns['Date'], dtype='datetime64[ns]')),
+        'Rank': pa.array(columns['Rank'], type=pa.int8()),
+        'Recommendation': pa.array(columns['Recommendation'], type=pa.string()),
+    })
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        pq.write_table(table, f"{output_path}.tmp")
+        os.replace(f"{output_path}.tmp", output_path)
+    return table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate recommendations for a grid of dates x stores/regions.")
+    parser.add_argument('--start', default=None, help="First date (default: the day after the last sales date).")
+    parser.add_argument('--periods', type=int, default=13, help="Number of dates.")
+    parser.add_argument('--freq', default='W', help="Spacing of the dates, a pandas frequency.")
+    parser.add_argument('--levels', nargs='+', choices=list(LEVEL_COLUMNS), default=['store', 'region'])
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument('--data', default=DATA_PATH, help="Data file to recommend from.")
+    parser.add_argument('--out', default=None, help="Output Parquet file (default: data/recommendations/<levels>-<start>-<data version>.parquet).")
+    args = parser.parse_args()
+
+    dates = recommendation_dates(args.start, args.periods, args.freq, args.data)
+    output_path = args.out or os.path.join(os.path.dirname(args.data), 'recommendations',
+                                           f"{'-'.join(args.levels)}-{dates[0]:%Y%m%d}-{data_version(args.data)}.parquet")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} partitions", end='', flush=True)
+
+    start = time.perf_counter()
+    result = batch_recommendations(dates, args.levels, args.workers, args.data, output_path, progress)
+    print()
+    print(f"{len(result):,} recommendations for {len(dates)} dates x "
+          f"{result.groupby(['Level', 'Key'], observed=True).ngroups} partitions in "
+          f"{time.perf_counter() - start:.1f} s -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# utils/chunked_loader.py
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.data_loader import CSV_DTYPES, clean_sales_data, parse_dates
+
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+
+# name -> (group keys, value column); these are the aggregates the pages build
+DEFAULT_AGGREGATES = {
+    'daily_demand': (['Date'], 'Units Ordered'),
+    'product_sales': (['Product ID'], 'Units Sold'),
+    'product_demand': (['Product ID'], 'Units Ordered'),
+    'category_sales': (['Category'], 'Units Sold'),
+}
+
+# Combine buffered partial results once this many have piled up
+_COMPACT_EVERY = 32
+
+
+def csv_byte_ranges(file_path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Splits a CSV file into (start, end) byte ranges that each end on a line break.
+    The header line is excluded. Assumes no quoted field contains a newline.
+    """
+    size = os.path.getsize(file_path)
+    ranges = []
+    with open(file_path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def csv_header(file_path):
+    """
+    Returns the column names from the first line of the CSV.
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        return pd.read_csv(io.StringIO(f.readline())).columns.tolist()
+
+
+def read_clean_chunk(file_path, start, end, names=None):
+    """
+    Reads and cleans the rows stored in one byte range of the CSV.
+
+    Rows whose date cannot be parsed are flagged in an '_undated' column.
+    The in-memory loader forward-fills them with the latest date in the file,
+    which a single chunk cannot know, so the aggregator resolves them at the end.
+    """
+    names = names or csv_header(file_path)
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=names, dtype=CSV_DTYPES)
+    chunk.columns = chunk.columns.str.strip()
+    if 'Date' in chunk.columns:
+        chunk['Date'] = parse_dates(chunk['Date'])
+        chunk['_undated'] = chunk['Date'].isna()
+    return clean_sales_data(chunk)
+
+
+def iter_clean_chunks(file_path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Yields cleaned chunks of the CSV one at a time, holding a single chunk in memory.
+    """
+    names = csv_header(file_path)
+    for start, end in csv_byte_ranges(file_path, chunk_bytes):
+        yield read_clean_chunk(file_path, start, end, names)
+
+
+def aggregate_chunk(chunk, aggregates):
+    """
+    Computes partial sums of every aggregate for one cleaned chunk.
+
+    Undated rows are summed separately under the remaining keys so they can
+    be credited to the final date once all chunks are seen.
+    """
+    partials = {}
+    undated = chunk['_undated'] if '_undated' in chunk.columns else None
+    dated_chunk = chunk if undated is None else chunk[~undated]
+    undated_chunk = None if undated is None else chunk[undated]
+    last_date = dated_chunk['Date'].max() if 'Date' in chunk.columns else None
+
+    for name, (keys, value) in aggregates.items():
+        if undated_chunk is not None and 'Date' in keys:
+            dated = dated_chunk.groupby(keys, observed=True)[value].sum()
+            other_keys = [key for key in keys if key != 'Date']
+            if other_keys:
+                pending = undated_chunk.groupby(other_keys, observed=True)[value].sum()
+            else:
+                pending = pd.Series([undated_chunk[value].sum()], index=pd.Index([0]))
+            partials[name] = (dated, pending)
+        else:
+            partials[name] = (chunk.groupby(keys, observed=True)[value].sum(), None)
+
+    return partials, last_date
+
+
+def _aggregate_range(args):
+    file_path, names, start, end, aggregates = args
+    return aggregate_chunk(read_clean_chunk(file_path, start, end, names), aggregates)
+
+
+def _combine(parts):
+    parts = [part for part in parts if part is not None and len(part)]
+    if not parts:
+        return None
+    combined = pd.concat(parts)
+    return combined.groupby(level=list(range(combined.index.nlevels)), observed=True).sum()
+
+
+def _resolve_undated(total, pending, keys, last_date):
+    """
+    Credits the undated rows to the last date, as the in-memory forward-fill does.
+    """
+    if pending is None or pd.isna(last_date):
+        return total
+    if len(keys) == 1:
+        pending = pd.Series([pending.sum()], index=pd.DatetimeIndex([last_date], name='Date'))
+    else:
+        pending = pending.to_frame()
+        pending['Date'] = last_date
+        pending = pending.set_index('Date', append=True).reorder_levels(keys).iloc[:, 0]
+    return _combine([total, pending])
+
+
+def aggregate_sales_csv(file_path, aggregates=None, chunk_bytes=DEFAULT_CHUNK_BYTES, workers=1):
+    """
+    Streams the CSV in chunks and returns the requested aggregates as Series.
+
+    Memory is bounded by the chunk size times the number of workers plus the
+    number of distinct keys. With workers > 1 chunk parsing is spread across a
+    process pool; each worker reads its own byte range, so only offsets are sent.
+
+    Args:
+        file_path: Path to the sales CSV.
+        aggregates: Mapping of name -> (group keys, value column) to sum.
+            Defaults to DEFAULT_AGGREGATES.
+        chunk_bytes: Approximate size of each chunk read from disk.
+        workers: Number of worker processes used to parse chunks.
+
+    Returns:
+        A dict of name -> Series, indexed like the equivalent
+        df.groupby(keys)[value].sum() over the cleaned frame.
+    """
+    aggregates = aggregates or DEFAULT_AGGREGATES
+    names = csv_header(file_path)
+    tasks = [(file_path, names, start, end, aggregates) for start, end in csv_byte_ranges(file_path, chunk_bytes)]
+
+    totals = {name: [] for name in aggregates}
+    pending = {name: [] for name in aggregates}
+    last_date = pd.NaT
+
+    def consume(results):
+        nonlocal last_date
+        for partials, chunk_last_date in results:
+            if not pd.isna(chunk_last_date) and (pd.isna(last_date) or chunk_last_date > last_date):
+                last_date = chunk_last_date
+            for name, (dated, undated) in partials.items():
+                totals[name].append(dated)
+                pending[name].append(undated)
+                if len(totals[name]) >= _COMPACT_EVERY:
+                    totals[name] = [_combine(totals[name])]
+                    pending[name] = [_combine(pending[name])]
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            consume(executor.map(_aggregate_range, tasks))
+    else:
+        consume(map(_aggregate_range, tasks))
+
+    result = {}
+    for name, (keys, value) in aggregates.items():
+        total = _resolve_undated(_combine(totals[name]), _combine(pending[name]), keys, last_date)
+        if total is None:
+            total = pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=keys) if len(keys) > 1 else pd.Index([], name=keys[0]))
+        result[name] = total.sort_index().rename(value)
+    return result
@@ -0,0 +1,133 @@
+# utils/cube.py
+
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.data_cache import cache_dir_for, data_version
+from utils.data_loader import DATA_PATH, load_and_clean_data
+
+CUBE_FORMAT_VERSION = 1
+
+DIMENSIONS = ['Date', 'Category', 'Region', 'Store ID', 'Holiday/Promotion']
+MEASURES = ['Units Sold', 'Units Ordered']
+COUNT_COLUMN = 'Row Count'
+
+_cubes = {}
+_lock = threading.Lock()
+
+
+def _cube_path(file_path, version):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{name}-cube{CUBE_FORMAT_VERSION}-{version}.arrow")
+
+
+def build_cube(df):
+    """
+    Rolls cleaned rows up to one row per Date x Category x Region x Store x Promotion.
+
+    The measure columns keep their names and hold sums, and 'Row Count' holds
+    the number of raw rows, so means are sum / count. Any groupby over the
+    dimensions that sums a measure gives the same answer on the cube as on the rows.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=DIMENSIONS + MEASURES + [COUNT_COLUMN])
+    dimensions = [col for col in DIMENSIONS if col in df.columns]
+    grouped = df.groupby(dimensions, observed=True, sort=True)
+    cube = grouped[MEASURES].sum()
+    cube[COUNT_COLUMN] = grouped.size()
+    return cube.reset_index()
+
+
+def _merge_cubes(cube, delta_cube):
+    for col in DIMENSIONS:
+        if isinstance(cube[col].dtype, pd.CategoricalDtype):
+            categories = cube[col].cat.categories.union(delta_cube[col].cat.categories)
+            cube[col] = cube[col].cat.set_categories(categories)
+            delta_cube[col] = delta_cube[col].cat.set_categories(categories)
+    combined = pd.concat([cube, delta_cube], ignore_index=True)
+    return combined.groupby(DIMENSIONS, observed=True, sort=True)[MEASURES + [COUNT_COLUMN]].sum().reset_index()
+
+
+def _save_cube(file_path, version, cube):
+    path = _cube_path(file_path, version)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(cube, preserve_index=False)
+    with pa.OSFile(f"{path}.tmp", 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(f"{path}.tmp", path)
+
+    # Drop cubes of older data versions
+    prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+    for entry in os.listdir(os.path.dirname(path)):
+        if entry.startswith(prefix) and entry != os.path.basename(path):
+            try:
+                os.remove(os.path.join(os.path.dirname(path), entry))
+            except OSError:
+                pass
+
+
+def _load_cube(file_path, version):
+    try:
+        source = pa.memory_map(_cube_path(file_path, version), 'r')
+        return pa.ipc.open_file(source).read_all().to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def get_cube(file_path=DATA_PATH):
+    """
+    Returns the rollup cube for the current data version, building it once
+    per version and sharing it across callers in the process.
+    """
+    version = data_version(file_path)
+    cache_key = (os.path.abspath(file_path), version)
+    with _lock:
+        if cache_key in _cubes:
+            return _cubes[cache_key]
+        cube = _load_cube(file_path, version)
+        if cube is None:
+            cube = build_cube(load_and_clean_data(file_path))
+            if version is not None:
+                _save_cube(file_path, version, cube)
+        for key in [key for key in _cubes if key[0] == cache_key[0]]:
+            del _cubes[key]
+        _cubes[cache_key] = cube
+        return cube
+
+
+def append_to_cube(file_path, delta, previous_version, version):
+    """
+    Folds freshly appended, cleaned rows into the cube of the previous data version.
+    Returns False when there is no cube for previous_version to extend.
+    """
+    cube = _load_cube(file_path, previous_version)
+    if cube is None:
+        return False
+    _save_cube(file_path, version, _merge_cubes(cube, build_cube(delta)))
+    return True
+
+
+def slice_cube(cube, start_date=None, end_date=None, regions=None):
+    """
+    Returns the cube cells within an inclusive date range and a set of regions.
+    The cube is sorted by Date, so the date range is a binary search, not a scan.
+    """
+    dates = cube['Date'].to_numpy()
+    start = 0 if start_date is None else dates.searchsorted(pd.Timestamp(start_date).to_datetime64(), side='left')
+    end = len(cube) if end_date is None else dates.searchsorted(pd.Timestamp(end_date).to_datetime64(), side='right')
+    cells = cube.iloc[start:end]
+    if regions is not None:
+        cells = cells[cells['Region'].isin(regions)]
+    return cells
+
+
+def cube_mean(cells, by, measure):
+    """
+    Returns the mean of a measure per group, weighted by the raw row counts.
+    """
+    grouped = cells.groupby(by, observed=True)[[measure, COUNT_COLUMN]].sum()
+    return grouped[measure] / grouped[COUNT_COLUMN]
@@ -0,0 +1,233 @@
+# utils/data_cache.py
+
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+
+# Bump this whenever the layout of the cleaned frame changes, so old caches are rebuilt
+CACHE_FORMAT_VERSION = 4
+CACHE_DIR_NAME = '.cache'
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def cache_dir_for(file_path):
+    """
+    Returns the cache directory that lives next to the source data file.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+
+
+def _manifest_path(file_path):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{name}.manifest.json")
+
+
+def _read_manifest(file_path):
+    try:
+        with open(_manifest_path(file_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(file_path, manifest):
+    path = _manifest_path(file_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def file_content_hash(file_path):
+    """
+    Returns the SHA-256 hex digest of the file contents, read in 1 MiB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint_path(file_path):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{name}.fingerprint.json")
+
+
+def file_fingerprint(file_path):
+    """
+    Returns the size, mtime and content hash of the source file.
+
+    Hashing a large CSV is not free, so the last computed hash is remembered
+    next to the cache and reused while size and mtime are unchanged. Any change
+    to either forces a rehash, which also lets a touched-but-identical file
+    keep its caches.
+    """
+    stat = os.stat(file_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    try:
+        with open(_fingerprint_path(file_path), 'r', encoding='utf-8') as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+    if known.get('size') == fingerprint['size'] and known.get('mtime_ns') == fingerprint['mtime_ns']:
+        fingerprint['sha256'] = known['sha256']
+        return fingerprint
+
+    fingerprint['sha256'] = file_content_hash(file_path)
+    try:
+        record_fingerprint(file_path, fingerprint)
+    except OSError:
+        pass
+    return fingerprint
+
+
+def data_version(file_path):
+    """
+    Returns a short identifier of the current contents of the data file,
+    or None if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return None
+    return file_fingerprint(file_path)['sha256'][:16]
+
+
+def chain_content_hash(previous_sha256, appended_bytes):
+    """
+    Derives the content hash of a file after appending bytes to it, without
+    rereading the existing contents. The result differs from a full rehash of
+    the file, so caches rebuild if the chained record is ever lost.
+    """
+    digest = hashlib.sha256(previous_sha256.encode('ascii'))
+    digest.update(hashlib.sha256(appended_bytes).digest())
+    return digest.hexdigest()
+
+
+def record_fingerprint(file_path, fingerprint):
+    """
+    Stores a fingerprint computed elsewhere, e.g. after an incremental append.
+    """
+    os.makedirs(cache_dir_for(file_path), exist_ok=True)
+    path = _fingerprint_path(file_path)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _write_table(table_path, df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{table_path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, table_path)
+
+
+def _last_date(df):
+    if 'Date' not in df.columns or df['Date'].isna().all():
+        return None
+    return df['Date'].max().isoformat()
+
+
+def _table_name(file_path, fingerprint):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return f"{name}-{fingerprint['sha256'][:16]}.arrow"
+
+
+def _remove_tables(file_path, names):
+    for name in names:
+        try:
+            os.remove(os.path.join(cache_dir_for(file_path), name))
+        except OSError:
+            pass
+
+
+def read_cached_frame(file_path, fingerprint):
+    """
+    Returns the cached cleaned frame for the given fingerprint, or None on a miss.
+    The Arrow files are memory-mapped, so numeric columns are not copied into RAM up front.
+    """
+    manifest = _read_manifest(file_path)
+    if not manifest or manifest.get('format') != CACHE_FORMAT_VERSION:
+        return None
+    if manifest.get('source', {}).get('sha256') != fingerprint['sha256']:
+        return None
+
+    tables = []
+    try:
+        for table_name in manifest['tables']:
+            source = pa.memory_map(os.path.join(cache_dir_for(file_path), table_name), 'r')
+            tables.append(pa.ipc.open_file(source).read_all())
+        # Appended segments may have been downcast to narrower types than the base
+        table = pa.concat_tables(tables, promote_options='permissive') if len(tables) > 1 else tables[0]
+    except (OSError, pa.ArrowException):
+        return None
+
+    return table.to_pandas(split_blocks=True)
+
+
+def write_cached_frame(file_path, df, fingerprint):
+    """
+    Writes the cleaned frame to an Arrow IPC file and points the manifest at it.
+    Failures are swallowed: the cache is an optimisation, never a requirement.
+    """
+    cache_dir = cache_dir_for(file_path)
+    table_name = _table_name(file_path, fingerprint)
+    previous = _read_manifest(file_path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_table(os.path.join(cache_dir, table_name), df)
+        _write_manifest(file_path, {
+            'format': CACHE_FORMAT_VERSION,
+            'source': fingerprint,
+            'tables': [table_name],
+            'last_date': _last_date(df),
+        })
+    except (OSError, pa.ArrowException):
+        return
+
+    # Drop the tables of the previous data version
+    if previous:
+        _remove_tables(file_path, [name for name in previous.get('tables', []) if name != table_name])
+
+
+def append_cached_frame(file_path, delta, previous_fingerprint, fingerprint):
+    """
+    Adds the cleaned rows of an append to the cache as a new Arrow segment, so
+    the cost scales with the delta rather than with the full history.
+
+    Returns False when there is no cache for previous_fingerprint to extend;
+    the next load then rebuilds it from the CSV.
+    """
+    manifest = _read_manifest(file_path)
+    if not manifest or manifest.get('format') != CACHE_FORMAT_VERSION:
+        return False
+    if manifest.get('source', {}).get('sha256') != previous_fingerprint['sha256']:
+        return False
+
+    table_name = _table_name(file_path, fingerprint)
+    try:
+        _write_table(os.path.join(cache_dir_for(file_path), table_name), delta)
+        manifest['source'] = fingerprint
+        manifest['tables'].append(table_name)
+        dates = [date for date in (manifest.get('last_date'), _last_date(delta)) if date]
+        manifest['last_date'] = max(dates) if dates else None
+        _write_manifest(file_path, manifest)
+    except (OSError, pa.ArrowException):
+        return False
+    return True
+
+
+def cached_frame_info(file_path):
+    """
+    Returns the cache manifest (source fingerprint, segment list and last date),
+    or None if nothing is cached.
+    """
+    manifest = _read_manifest(file_path)
+    if not manifest or manifest.get('format') != CACHE_FORMAT_VERSION:
+        return None
+    return manifest
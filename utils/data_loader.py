@@ -1,18 +1,52 @@
 # utils/data_loader.py
 
+import os
 import pandas as pd
 import streamlit as st
+from utils.data_cache import file_fingerprint, read_cached_frame, write_cached_frame
 
-def load_and_clean_data(file_path):
+DATA_PATH = os.path.join('data', 'sales_data.csv')
+
+# Declared ingestion schema for sales_data.csv
+DATE_FORMAT = '%Y-%m-%d'
+CATEGORICAL_COLUMNS = ['Store ID', 'Product ID', 'Category', 'Region', 'Weather Condition', 'Seasonality']
+INTEGER_COLUMNS = ['Inventory Level', 'Units Sold', 'Units Ordered', 'Discount']
+FLOAT_COLUMNS = ['Demand Forecast', 'Price', 'Competitor Pricing']
+CSV_DTYPES = {col: 'category' for col in CATEGORICAL_COLUMNS}
+
+def load_and_clean_data(file_path, use_cache=True):
     """
     Loads sales data from a CSV file, cleans it, and prepares it for analysis.
+    The cleaned frame is cached as an Arrow file next to the CSV, so later calls
+    memory-map the cache and skip parsing until the source file changes.
     """
+    if not os.path.exists(file_path):
+        st.error(f"Error: The file '{file_path}' was not found.")
+        return pd.DataFrame()
+
+    if use_cache:
+        fingerprint = file_fingerprint(file_path)
+        cached = read_cached_frame(file_path, fingerprint)
+        if cached is not None:
+            return cached
+
     try:
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(file_path, dtype=CSV_DTYPES)
     except FileNotFoundError:
         st.error(f"Error: The file '{file_path}' was not found.")
         return pd.DataFrame()
 
+    df = clean_sales_data(df)
+
+    if use_cache:
+        write_cached_frame(file_path, df, fingerprint)
+
+    return df
+
+def clean_sales_data(df):
+    """
+    Standardizes column names and types of a raw sales frame.
+    """
     # Define standard column names and their provided variations
     column_mapping = {
         'Date': 'Date',
@@ -37,22 +71,48 @@ def load_and_clean_data(file_path):
 
     # Data cleaning and preparation
     if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df.sort_values('Date', inplace=True)
+        df['Date'] = parse_dates(df['Date'])
+        df.sort_values('Date', kind='stable', inplace=True)
+        df.reset_index(drop=True, inplace=True)
     
     df.columns = df.columns.str.strip()
     
-    # Fill missing values for numerical columns
-    numerical_cols = ['Inventory Level', 'Units Sold', 'Units Ordered', 'Demand Forecast', 'Price', 'Discount', 'Competitor Pricing']
-    for col in numerical_cols:
+    # Fill missing values for numerical columns and downcast them
+    for col in INTEGER_COLUMNS + FLOAT_COLUMNS:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            df[col] = downcast_numeric(pd.to_numeric(df[col], errors='coerce').fillna(0))
+
+    # ID and label columns are low-cardinality, store them as categoricals
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
     
     # Convert 'Holiday/Promotion' to boolean
     if 'Holiday/Promotion' in df.columns:
         df['Holiday/Promotion'] = df['Holiday/Promotion'].astype(bool)
 
     # Forward-fill any remaining missing data
-    df.fillna(method='ffill', inplace=True)
+    df.ffill(inplace=True)
 
-    return df
\ No newline at end of file
+    return df
+
+def parse_dates(values):
+    """
+    Parses dates with the declared format, falling back to inference for files
+    written in a different format.
+    """
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+    if dates.isna().all() and values.notna().any():
+        dates = pd.to_datetime(values, errors='coerce')
+    return dates
+
+def downcast_numeric(series):
+    """
+    Downcasts a numeric column to the smallest integer type when all values are
+    whole numbers, otherwise to float32.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series) or (series % 1 == 0).all():
+        return pd.to_numeric(series.astype('int64'), downcast='integer')
+    return pd.to_numeric(series, downcast='float')
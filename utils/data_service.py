@@ -0,0 +1,64 @@
+# utils/data_service.py
+
+import os
+import threading
+
+import pandas as pd
+
+from utils.data_cache import data_version
+from utils.data_loader import DATA_PATH, load_and_clean_data
+
+_frames = {}
+_lock = threading.Lock()
+
+
+def _read_only_column(series):
+    """
+    Returns the column backed by a non-writeable array, without copying data
+    that is already read-only (e.g. memory-mapped from the Arrow cache).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categorical.codes is always a read-only view, so the codes are locked on a private copy
+        codes = series.cat.codes.to_numpy().copy()
+        codes.flags.writeable = False
+        values = pd.Categorical.from_codes(codes, dtype=series.dtype)
+    else:
+        values = series.to_numpy(copy=False)
+        if values.flags.writeable:
+            values = values.copy()
+            values.flags.writeable = False
+    return pd.Series(values, index=series.index, name=series.name, copy=False)
+
+
+def read_only_frame(df):
+    """
+    Returns a DataFrame whose every column is backed by a non-writeable array,
+    so writing values in place (df.loc[...] = ..., fillna(inplace=True), ...)
+    raises instead of changing data other callers see.
+    """
+    if df.empty:
+        return df
+    return pd.concat([_read_only_column(df[col]) for col in df.columns], axis=1, copy=False)
+
+
+def get_sales_data(file_path=DATA_PATH):
+    """
+    Returns the cleaned sales data, loaded once per data version and shared by
+    every session of the process.
+
+    Each caller gets its own shallow view: adding, replacing or reordering
+    columns only affects that view, and the shared values are read-only.
+    Functions that derive columns must work on a copy (df.copy(deep=False)
+    is enough to add columns).
+    """
+    version = data_version(file_path)
+    cache_key = (os.path.abspath(file_path), version)
+    with _lock:
+        frame = _frames.get(cache_key)
+        if frame is None:
+            frame = read_only_frame(load_and_clean_data(file_path))
+            for key in [key for key in _frames if key[0] == cache_key[0]]:
+                del _frames[key]
+            _frames[cache_key] = frame
+    return frame.copy(deep=False)
+
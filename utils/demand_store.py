@@ -0,0 +1,271 @@
+# utils/demand_store.py
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.chunked_loader import aggregate_sales_csv
+from utils.data_cache import cache_dir_for, data_version
+from utils.data_loader import DATA_PATH
+
+STORE_FORMAT_VERSION = 3
+
+# level -> group key(s) of the per-key demand matrices
+LEVEL_KEYS = {
+    'store': 'Store ID',
+    'product': 'Product ID',
+    'category': 'Category',
+    'store_product': ('Store ID', 'Product ID'),
+}
+# Joins the values of multi-column keys, e.g. 'S001|P0001'
+KEY_SEPARATOR = '|'
+
+_open_stores = {}
+_lock = threading.Lock()
+
+
+def _store_dir(file_path, version):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{name}-demand-{version}")
+
+
+def level_columns(level):
+    """
+    Returns the group key columns of a level as a list.
+    """
+    key = LEVEL_KEYS[level]
+    return list(key) if isinstance(key, tuple) else [key]
+
+
+def _level_name(level):
+    return KEY_SEPARATOR.join(level_columns(level))
+
+
+def _unstack(totals, columns):
+    """
+    Turns (Date, *columns) sums into a days x keys frame with string keys.
+    Multi-column keys are joined first, so only combinations that occur get a column.
+    """
+    if len(columns) > 1:
+        keys = totals.index.get_level_values(columns[0]).astype(str)
+        for col in columns[1:]:
+            keys = keys + KEY_SEPARATOR + totals.index.get_level_values(col).astype(str)
+        index = pd.MultiIndex.from_arrays([totals.index.get_level_values('Date'), keys], names=['Date', 'key'])
+        totals = pd.Series(totals.to_numpy(), index=index).groupby(level=[0, 1]).sum()
+        frame = totals.unstack('key', fill_value=0)
+    else:
+        frame = totals.unstack(columns[0], fill_value=0)
+    frame.columns = frame.columns.astype(str)
+    return frame
+
+
+def _widen(values):
+    """
+    Stores counts as int64 and everything else as float64, so sums never overflow.
+    """
+    dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def _store_aggregates():
+    aggregates = {'daily': (['Date'], 'Units Ordered')}
+    for level in LEVEL_KEYS:
+        aggregates[f"{level}_daily"] = (['Date'] + level_columns(level), 'Units Ordered')
+        aggregates[f"{level}_sold"] = (['Date'] + level_columns(level), 'Units Sold')
+    return aggregates
+
+
+def _frames_from_totals(totals):
+    """
+    Turns (Date, key) sums into dense days x keys frames on one date axis.
+    """
+    daily = totals['daily']
+    frames = {'daily': daily}
+    for level in LEVEL_KEYS:
+        ordered = _unstack(totals[f"{level}_daily"], level_columns(level)).reindex(daily.index, fill_value=0)
+        sold = _unstack(totals[f"{level}_sold"], level_columns(level))
+        sold = sold.reindex(index=daily.index, columns=ordered.columns, fill_value=0)
+        frames[f"{level}_daily"] = ordered
+        frames[f"{level}_sold"] = sold
+    return frames
+
+
+def _frames_from_arrays(arrays):
+    dates = pd.DatetimeIndex(arrays['dates'].astype('datetime64[ns]'), name='Date')
+    frames = {'daily': pd.Series(arrays['daily'], index=dates)}
+    for level in LEVEL_KEYS:
+        for name in (f"{level}_daily", f"{level}_sold"):
+            frames[name] = pd.DataFrame(arrays[name], index=dates, columns=arrays[f"{level}_keys"])
+    return frames
+
+
+def _write_store(store_dir, version, frames):
+    tmp_dir = f"{store_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    daily = frames['daily']
+    np.save(os.path.join(tmp_dir, 'dates.npy'), daily.index.values.astype('datetime64[D]'))
+    np.save(os.path.join(tmp_dir, 'daily.npy'), _widen(daily.to_numpy()))
+    for level in LEVEL_KEYS:
+        ordered = frames[f"{level}_daily"]
+        keys = np.array(ordered.columns.astype(str).tolist(), dtype=str)
+        np.save(os.path.join(tmp_dir, f"{level}_keys.npy"), keys)
+        np.save(os.path.join(tmp_dir, f"{level}_daily.npy"), _widen(ordered.to_numpy()))
+        np.save(os.path.join(tmp_dir, f"{level}_sold.npy"), _widen(frames[f"{level}_sold"].to_numpy()))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'format': STORE_FORMAT_VERSION, 'version': version}, f)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+
+    # Drop stores of older data versions
+    prefix = os.path.basename(store_dir).rsplit('-', 1)[0] + '-'
+    for entry in os.listdir(os.path.dirname(store_dir)):
+        if entry.startswith(prefix) and entry != os.path.basename(store_dir):
+            shutil.rmtree(os.path.join(os.path.dirname(store_dir), entry), ignore_errors=True)
+    return store_dir
+
+
+def build_demand_store(file_path=DATA_PATH, version=None, workers=1):
+    """
+    Aggregates the CSV into daily demand arrays and saves them as .npy files.
+
+    The store holds the grand-total daily Units Ordered series plus, for each
+    store, product, category and store x product pair, days x keys matrices of Units Ordered and
+    Units Sold, all on the same date axis. Aggregation streams the CSV, so the
+    raw file never has to fit in memory.
+    """
+    version = version or data_version(file_path)
+    totals = aggregate_sales_csv(file_path, _store_aggregates(), workers=workers)
+    return _write_store(_store_dir(file_path, version), version, _frames_from_totals(totals))
+
+
+def _read_meta(store_dir):
+    try:
+        with open(os.path.join(store_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def append_to_demand_store(file_path, delta, previous_version, version):
+    """
+    Adds the sums of freshly appended, cleaned rows to the store of the
+    previous data version and saves the result as the store of `version`.
+
+    Only the delta rows are aggregated; the existing arrays are combined cell
+    by cell, so the cost depends on days x keys rather than on total rows.
+    Returns False when there is no store for previous_version to extend.
+    """
+    previous_dir = _store_dir(file_path, previous_version)
+    if _read_meta(previous_dir).get('format') != STORE_FORMAT_VERSION:
+        return False
+
+    old = _frames_from_arrays(_open_store(previous_dir))
+    new = _frames_from_totals({
+        name: delta.groupby(keys, observed=True)[value].sum()
+        for name, (keys, value) in _store_aggregates().items()
+    })
+
+    merged = {}
+    for name, frame in old.items():
+        combined = frame.add(new[name], fill_value=0).fillna(0).sort_index()
+        if isinstance(combined, pd.DataFrame):
+            combined = combined.sort_index(axis=1)
+        if np.issubdtype(np.asarray(frame).dtype, np.integer) and np.issubdtype(np.asarray(new[name]).dtype, np.integer):
+            combined = combined.astype(np.int64)
+        merged[name] = combined
+
+    with _lock:
+        for key in [key for key in _open_stores if key[0] == os.path.abspath(file_path)]:
+            del _open_stores[key]
+        _write_store(_store_dir(file_path, version), version, merged)
+    return True
+
+
+def _open_store(store_dir):
+    arrays = {}
+    for entry in os.listdir(store_dir):
+        if entry.endswith('.npy'):
+            # Keys are tiny, everything else stays on disk and is paged in on access
+            mmap_mode = None if entry.endswith('_keys.npy') else 'r'
+            arrays[entry[:-4]] = np.load(os.path.join(store_dir, entry), mmap_mode=mmap_mode)
+    return arrays
+
+
+def get_demand_store(file_path=DATA_PATH):
+    """
+    Returns the memory-mapped demand arrays for the current version of the CSV,
+    building them first if this data version has not been materialized yet.
+    Opened stores are shared by every caller in the process.
+    """
+    version = data_version(file_path)
+    cache_key = (os.path.abspath(file_path), version)
+    with _lock:
+        if cache_key in _open_stores:
+            return _open_stores[cache_key]
+
+        store_dir = _store_dir(file_path, version)
+        if _read_meta(store_dir).get('format') != STORE_FORMAT_VERSION:
+            build_demand_store(file_path, version)
+
+        for key in [key for key in _open_stores if key[0] == cache_key[0]]:
+            del _open_stores[key]
+        _open_stores[cache_key] = _open_store(store_dir)
+        return _open_stores[cache_key]
+
+
+def load_daily_demand(file_path=DATA_PATH, store_id=None, product_id=None):
+    """
+    Returns daily Units Ordered as a Series indexed by Date.
+
+    By default this is the grand total over all rows. Pass a store_id and/or
+    a product_id to get that store's, product's or store x product pair's
+    series instead. The values are a read-only view of the memory-mapped
+    store, not a copy.
+    """
+    store = get_demand_store(file_path)
+    dates = pd.DatetimeIndex(store['dates'].astype('datetime64[ns]'), name='Date')
+
+    if store_id is None and product_id is None:
+        values = store['daily']
+    else:
+        if store_id is not None and product_id is not None:
+            level, key = 'store_product', f"{store_id}{KEY_SEPARATOR}{product_id}"
+        else:
+            level, key = ('store', store_id) if store_id is not None else ('product', product_id)
+        matches = np.flatnonzero(store[f"{level}_keys"] == str(key))
+        if not len(matches):
+            raise KeyError(f"{_level_name(level)} '{key}' not found in the data.")
+        values = store[f"{level}_daily"][:, matches[0]]
+
+    return pd.Series(values, index=dates, name='Units Ordered', copy=False)
+
+
+def load_demand_matrix(file_path=DATA_PATH, level='store', value='Units Ordered'):
+    """
+    Returns (dates, keys, matrix) for the given level, where matrix is a
+    memory-mapped days x keys array of the daily sum of `value`.
+    """
+    if level not in LEVEL_KEYS:
+        raise ValueError(f"Unknown level '{level}', expected one of {list(LEVEL_KEYS)}.")
+    if value not in ('Units Ordered', 'Units Sold'):
+        raise ValueError(f"Unknown value '{value}', expected 'Units Ordered' or 'Units Sold'.")
+    store = get_demand_store(file_path)
+    dates = pd.DatetimeIndex(store['dates'].astype('datetime64[ns]'), name='Date')
+    suffix = 'daily' if value == 'Units Ordered' else 'sold'
+    return dates, store[f"{level}_keys"], store[f"{level}_{suffix}"]
+
+
+def load_key_totals(file_path=DATA_PATH, level='product', value='Units Sold'):
+    """
+    Returns the all-time total of `value` per store, product or category,
+    e.g. the product_sales and category_sales totals the pages show.
+    """
+    _, keys, matrix = load_demand_matrix(file_path, level, value)
+    return pd.Series(matrix.sum(axis=0), index=pd.Index(keys, name=_level_name(level)), name=value)
@@ -0,0 +1,132 @@
+# utils/downsampling.py
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# Streamlit does not report the chart width to the server; this is a wide container
+DEFAULT_WIDTH_PX = 1200
+# Above this many plotted points, lines are drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = 2000
+METHODS = ['lttb', 'minmax']
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-triangle-three-buckets: returns the positions of n_out points that
+    keep the visual shape of the line, always including the first and last.
+    x must be sorted.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), np.asarray(y, dtype=np.float64)
+
+    # The points between the first and the last are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean point of every bucket, the last point standing in for the bucket after the last
+    bounds = np.append(edges, n)
+    counts = np.diff(bounds)
+    mean_x = np.add.reduceat(x, bounds[:-1]) / counts
+    mean_y = np.add.reduceat(y, bounds[:-1]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        avg_x, avg_y = mean_x[i + 1], mean_y[i + 1]
+        # Twice the area of the triangle (previous pick, candidate, next bucket's mean)
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max decimation: returns the positions of the lowest and highest point
+    of each of n_out // 2 equal buckets, plus the first and last, in order.
+    Peaks and dips are never dropped.
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+
+    bucket = np.arange(n) * n_buckets // n
+    # Within each bucket, the first position in value order is the minimum and the last the maximum
+    order = np.lexsort((y, bucket))
+    last = np.flatnonzero(np.diff(bucket[order], append=n_buckets))
+    first = np.concatenate([[0], last[:-1] + 1])
+    return np.unique(np.concatenate([[0, n - 1], order[first], order[last]]))
+
+
+def downsample(x, y, width_px=DEFAULT_WIDTH_PX, x_range=None, method='lttb'):
+    """
+    Returns the positions of the points to plot for one line: those inside
+    x_range (plus one point beyond each end, so the line reaches the edges),
+    reduced to about one point per pixel of width_px when there are more.
+
+    Args:
+        x: Sorted x values (numbers or datetimes).
+        y: The y values.
+        width_px: Plot width in pixels.
+        x_range: Optional (start, end) of the visible x axis.
+        method: 'lttb' (shape-preserving) or 'minmax' (keeps every bucket's extremes).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}.")
+    x = np.asarray(x)
+    start, stop = 0, len(x)
+    if x_range is not None:
+        low, high = x_range
+        if np.issubdtype(x.dtype, np.datetime64):
+            low, high = pd.Timestamp(low).to_datetime64(), pd.Timestamp(high).to_datetime64()
+        start = max(int(np.searchsorted(x, low, side='left')) - 1, 0)
+        stop = min(int(np.searchsorted(x, high, side='right')) + 1, len(x))
+
+    if method == 'lttb':
+        positions = lttb_indices(x[start:stop], np.asarray(y)[start:stop], width_px)
+    else:
+        positions = minmax_indices(np.asarray(y)[start:stop], width_px)
+    return start + positions
+
+
+def downsample_frame(df, x, y, color=None, width_px=DEFAULT_WIDTH_PX, x_range=None, method='lttb'):
+    """
+    Downsamples every line of a long-format frame (one line per value of
+    `color`, or a single line) with downsample(). Returns a new frame.
+    """
+    if color is None:
+        groups = [df.sort_values(x) if not df[x].is_monotonic_increasing else df]
+    else:
+        groups = [group if group[x].is_monotonic_increasing else group.sort_values(x)
+                  for _, group in df.groupby(color, sort=False, observed=True)]
+    parts = [group.iloc[downsample(group[x].to_numpy(), group[y].to_numpy(), width_px, x_range, method)]
+             for group in groups if len(group)]
+    return pd.concat(parts) if parts else df.iloc[:0]
+
+
+def render_mode(n_points, threshold=WEBGL_THRESHOLD):
+    """
+    Returns the plotly.express render_mode for a chart of n_points points.
+    """
+    return 'webgl' if n_points > threshold else 'svg'
+
+
+def line_chart(df, x, y, color=None, title=None, width_px=DEFAULT_WIDTH_PX, x_range=None, method='lttb', **kwargs):
+    """
+    px.line on the downsampled points of df, drawn with WebGL when many
+    points remain (e.g. many lines).
+    """
+    data = downsample_frame(df, x, y, color, width_px, x_range, method)
+    return px.line(data, x=x, y=y, color=color, title=title, render_mode=render_mode(len(data)), **kwargs)
@@ -2,38 +2,46 @@
 
 import pandas as pd
 import plotly.express as px
+from utils.cube import COUNT_COLUMN, cube_mean
+from utils.downsampling import DEFAULT_WIDTH_PX, line_chart
 
-def plot_interactive_demand(df: pd.DataFrame):
+def plot_interactive_demand(df: pd.DataFrame, width_px=DEFAULT_WIDTH_PX, x_range=None):
     """
     Creates an interactive line chart for total units ordered over time.
+    Works on raw rows and on cube cells alike. Long ranges are downsampled
+    to about one point per pixel of width_px.
     """
     daily_demand = df.groupby('Date')['Units Ordered'].sum().reset_index()
-    fig = px.line(daily_demand, x='Date', y='Units Ordered', title='Total Units Ordered Over Time')
+    fig = line_chart(daily_demand, 'Date', 'Units Ordered', title='Total Units Ordered Over Time',
+                     width_px=width_px, x_range=x_range)
     return fig
 
 def category_sales(df: pd.DataFrame):
     """
     Calculates total units sold by category.
     """
-    category_data = df.groupby('Category')['Units Sold'].sum().sort_values(ascending=False)
+    category_data = df.groupby('Category', observed=True)['Units Sold'].sum().sort_values(ascending=False)
     return category_data
 
 def season_demand_plot(df: pd.DataFrame):
     """
     Creates a bar chart for average demand per season using Plotly.
+    Accepts raw rows or cube cells; for the cube the mean is weighted by 'Row Count'.
     """
-    df['Date'] = pd.to_datetime(df['Date'])
-    
     # Map months to seasons
     season_map = {
         1: 'Winter', 2: 'Winter', 3: 'Spring', 4: 'Spring', 5: 'Spring',
         6: 'Summer', 7: 'Summer', 8: 'Summer', 9: 'Fall', 10: 'Fall',
         11: 'Fall', 12: 'Winter'
     }
-    df['Season'] = df['Date'].dt.month.map(season_map)
+    season = pd.to_datetime(df['Date']).dt.month.map(season_map).rename('Season')
     
     # Calculate average units ordered per season
-    seasonal_demand = df.groupby('Season')['Units Ordered'].mean().reindex(['Winter', 'Spring', 'Summer', 'Fall']).reset_index()
+    if COUNT_COLUMN in df.columns:
+        seasonal_demand = cube_mean(df, season, 'Units Ordered')
+    else:
+        seasonal_demand = df.groupby(season)['Units Ordered'].mean()
+    seasonal_demand = seasonal_demand.rename('Units Ordered').reindex(['Winter', 'Spring', 'Summer', 'Fall']).rename_axis('Season').reset_index()
     
     fig = px.bar(
         seasonal_demand,
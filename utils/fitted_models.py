@@ -0,0 +1,93 @@
+# utils/fitted_models.py
+
+import json
+import os
+import threading
+
+from utils.model_registry import get_model
+
+FITTED_MODEL_FORMAT = 1
+
+_refits = {}
+_refit_lock = threading.Lock()
+
+
+def _meta_path(model_path):
+    return f"{model_path}.meta.json"
+
+
+def read_fitted_meta(model_path):
+    """
+    Returns the sidecar metadata of a persisted model, or {} if there is none.
+    """
+    try:
+        with open(_meta_path(model_path), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if meta.get('format') != FITTED_MODEL_FORMAT:
+        return {}
+    return meta
+
+
+def fitted_model_version(model_path):
+    """
+    Returns the data version a persisted model was fitted on, or None if there is no model.
+    """
+    return read_fitted_meta(model_path).get('data_version')
+
+
+def save_fitted_model(model_path, model, version, dump, extra=None):
+    """
+    Writes a fitted model with dump(model, path) and records its data version,
+    plus any `extra` fields, in a sidecar <model_path>.meta.json.
+    """
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    dump(model, f"{model_path}.tmp")
+    os.replace(f"{model_path}.tmp", model_path)
+    with open(f"{_meta_path(model_path)}.tmp", 'w', encoding='utf-8') as f:
+        json.dump({**(extra or {}), 'format': FITTED_MODEL_FORMAT, 'data_version': version}, f)
+    os.replace(f"{_meta_path(model_path)}.tmp", _meta_path(model_path))
+
+
+def load_fitted_model(model_path, version, load):
+    """
+    Returns the persisted model if it was fitted on this data version, else None.
+    Loaded models are kept in the model registry.
+    """
+    if fitted_model_version(model_path) != version:
+        return None
+    try:
+        return get_model(model_path, load)
+    except (OSError, ValueError):
+        return None
+
+
+def get_fitted_model(model_path, version, fit, dump, load):
+    """
+    Returns the model fitted on this data version, calling fit() and saving
+    the result only when there is no persisted model for it yet.
+    """
+    model = load_fitted_model(model_path, version, load)
+    if model is None:
+        model = fit()
+        save_fitted_model(model_path, model, version, dump)
+    return model
+
+
+def refit_in_background(name, job):
+    """
+    Runs job() in a background thread, unless a refit with the same name is
+    still running. Returns the thread running the refit.
+
+    The thread is not a daemon, so a command-line process waits for it to
+    finish before exiting.
+    """
+    with _refit_lock:
+        running = _refits.get(name)
+        if running is not None and running.is_alive():
+            return running
+        thread = threading.Thread(target=job, name=f"refit-{name}")
+        _refits[name] = thread
+        thread.start()
+        return thread
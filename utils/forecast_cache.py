@@ -0,0 +1,121 @@
+# utils/forecast_cache.py
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+
+from utils.data_cache import cache_dir_for
+from utils.data_loader import DATA_PATH
+
+FORECAST_CACHE_FORMAT = 1
+
+# Forecasts kept in memory, and on disk under data/.cache/forecasts/
+MAX_MEMORY_ENTRIES = 128
+MAX_DISK_ENTRIES = 512
+
+_forecasts = OrderedDict()
+_lock = threading.Lock()
+
+
+def _forecast_dir(file_path=DATA_PATH):
+    return os.path.join(cache_dir_for(file_path), 'forecasts')
+
+
+def _forecast_path(key, file_path=DATA_PATH):
+    name = '-'.join(re.sub(r'[^A-Za-z0-9_.]', '_', str(part)) for part in key)
+    return os.path.join(_forecast_dir(file_path), f"{name}-f{FORECAST_CACHE_FORMAT}.arrow")
+
+
+def _read_forecast(path):
+    try:
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all().to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def _write_forecast(path, forecast):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(forecast.reset_index(drop=True), preserve_index=False)
+    with pa.OSFile(f"{path}.tmp", 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(f"{path}.tmp", path)
+
+    # Keep the newest files only
+    forecast_dir = os.path.dirname(path)
+    entries = [os.path.join(forecast_dir, entry) for entry in os.listdir(forecast_dir) if entry.endswith('.arrow')]
+    if len(entries) > MAX_DISK_ENTRIES:
+        entries.sort(key=lambda entry: os.stat(entry).st_mtime_ns)
+        for entry in entries[:len(entries) - MAX_DISK_ENTRIES]:
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+
+
+def cached_forecast(model, model_version, data_fingerprint, days, forecast):
+    """
+    Returns the first `days` rows of a forecast, computing it only when no
+    forecast at least that long is cached for this model and data.
+
+    Forecasts of ARIMA, Holt-Winters and Prophet for a shorter horizon are a
+    prefix of a longer one, so only the longest horizon computed so far is
+    stored per (model, model_version, data_fingerprint) and shorter requests
+    slice it. Entries live in a bounded in-memory LRU backed by Arrow files in
+    data/.cache/forecasts/, which survive restarts.
+
+    Args:
+        model: Model name, e.g. 'arima'.
+        model_version: Identifies the fitted model, e.g. its artifact version.
+        data_fingerprint: The data version the forecast is for.
+        days: The horizon requested.
+        forecast: Function that takes a horizon and returns the forecast frame,
+            one row per day.
+
+    Returns:
+        A new DataFrame with the first `days` rows of the forecast.
+    """
+    key = (model, model_version, data_fingerprint)
+    path = _forecast_path(key)
+
+    with _lock:
+        cached = _forecasts.get(key)
+        if cached is None:
+            cached = _read_forecast(path)
+            if cached is not None:
+                _forecasts[key] = cached
+        if cached is not None and len(cached) >= days:
+            _forecasts.move_to_end(key)
+            return cached.iloc[:days].copy()
+
+    result = forecast(days).reset_index(drop=True)
+    with _lock:
+        cached = _forecasts.get(key)
+        if cached is None or len(cached) < len(result):
+            _forecasts[key] = result
+            _forecasts.move_to_end(key)
+            while len(_forecasts) > MAX_MEMORY_ENTRIES:
+                _forecasts.popitem(last=False)
+            try:
+                _write_forecast(path, result)
+            except (OSError, pa.ArrowException):
+                pass
+    return result.copy()
+
+
+def clear_forecast_cache(file_path=DATA_PATH):
+    """
+    Empties the in-memory cache and deletes the cached forecast files.
+    """
+    with _lock:
+        _forecasts.clear()
+        forecast_dir = _forecast_dir(file_path)
+        if os.path.isdir(forecast_dir):
+            for entry in os.listdir(forecast_dir):
+                try:
+                    os.remove(os.path.join(forecast_dir, entry))
+                except OSError:
+                    pass
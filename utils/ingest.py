@@ -0,0 +1,185 @@
+# utils/ingest.py
+#
+# Appends new sales rows to the data file and refreshes the caches in place.
+#   python -m utils.ingest new_rows.csv [--data data/sales_data.csv] [--refit]
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from utils.chunked_loader import csv_header
+from utils.data_cache import (append_cached_frame, cached_frame_info, chain_content_hash,
+                              file_fingerprint, read_cached_frame, record_fingerprint,
+                              write_cached_frame)
+from utils.data_loader import CSV_DTYPES, DATA_PATH, DATE_FORMAT, clean_sales_data
+from utils.demand_store import append_to_demand_store
+from utils.partitioned_store import append_to_partitioned_dataset
+from utils.cube import append_to_cube
+from utils.fitted_models import refit_in_background
+
+# Past this many appended segments the frame cache is rewritten as one file
+MAX_SEGMENTS = 32
+
+
+def _read_new_rows(new_rows, columns):
+    """
+    Loads the new rows and checks they carry exactly the columns of the data file.
+    """
+    if isinstance(new_rows, pd.DataFrame):
+        raw = new_rows.copy()
+    else:
+        raw = pd.read_csv(new_rows, dtype=CSV_DTYPES)
+    raw.columns = raw.columns.str.strip()
+
+    missing = [col for col in columns if col not in raw.columns]
+    unexpected = [col for col in raw.columns if col not in columns]
+    if missing or unexpected:
+        raise ValueError(f"New rows do not match the data file: missing columns {missing}, unexpected columns {unexpected}.")
+    return raw[columns]
+
+
+def _concat_frames(base, delta):
+    """
+    Concatenates two cleaned frames without losing the categorical dtypes.
+    """
+    base, delta = base.copy(deep=False), delta.copy(deep=False)
+    for col in base.columns:
+        if isinstance(base[col].dtype, pd.CategoricalDtype) and isinstance(delta[col].dtype, pd.CategoricalDtype):
+            categories = base[col].cat.categories.union(delta[col].cat.categories)
+            base[col] = base[col].cat.set_categories(categories)
+            delta[col] = delta[col].cat.set_categories(categories)
+    return pd.concat([base, delta], ignore_index=True)
+
+
+def append_sales(new_rows, file_path=DATA_PATH):
+    """
+    Appends new sales rows to the CSV and updates the cleaned-data cache, the
+    demand store, the partitioned dataset and the rollup cube without
+    reprocessing the existing history.
+
+    The rows are validated and cleaned with the same rules as load_and_clean_data.
+    Rows dated on or after the last cached date are written as a new cache
+    segment; late rows, or too many segments, trigger a one-off rewrite of the
+    frame cache. Caches that do not exist yet are simply built on next load.
+
+    Args:
+        new_rows: Path to a CSV with the same columns as the data file, or a DataFrame.
+        file_path: The data file to append to.
+
+    Returns:
+        A dict summarising what was updated.
+    """
+    columns = csv_header(file_path)
+    raw = _read_new_rows(new_rows, columns)
+    if raw.empty:
+        return {'rows': 0, 'version': file_fingerprint(file_path)['sha256'][:16], 'frame_cache': 'unchanged', 'demand_store': False, 'partitions': False, 'cube': False}
+
+    delta = clean_sales_data(raw.copy())
+    if 'Date' in delta.columns and delta['Date'].isna().all():
+        raise ValueError("None of the new rows has a parseable 'Date'.")
+
+    previous = file_fingerprint(file_path)
+
+    # Append the rows as given, so a full rebuild sees exactly the same input
+    out = raw.copy()
+    if pd.api.types.is_datetime64_any_dtype(out['Date']):
+        out['Date'] = out['Date'].dt.strftime(DATE_FORMAT)
+    payload = out.to_csv(index=False, header=False, lineterminator='\n').encode('utf-8')
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                payload = b'\n' + payload
+    with open(file_path, 'ab') as f:
+        f.write(payload)
+
+    stat = os.stat(file_path)
+    fingerprint = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': chain_content_hash(previous['sha256'], payload),
+    }
+    record_fingerprint(file_path, fingerprint)
+
+    # Cleaned-data cache
+    info = cached_frame_info(file_path)
+    frame_cache = 'missing'
+    if info and info['source']['sha256'] == previous['sha256']:
+        in_order = info.get('last_date') and delta['Date'].min() >= pd.Timestamp(info['last_date'])
+        if in_order and len(info['tables']) < MAX_SEGMENTS and append_cached_frame(file_path, delta, previous, fingerprint):
+            frame_cache = 'appended'
+        else:
+            base = read_cached_frame(file_path, previous)
+            if base is not None:
+                merged = _concat_frames(base, delta)
+                merged.sort_values('Date', kind='stable', inplace=True)
+                merged.reset_index(drop=True, inplace=True)
+                write_cached_frame(file_path, merged, fingerprint)
+                frame_cache = 'compacted'
+
+    demand_store = append_to_demand_store(file_path, delta, previous['sha256'][:16], fingerprint['sha256'][:16])
+    partitions = append_to_partitioned_dataset(file_path, delta, previous['sha256'][:16], fingerprint['sha256'][:16])
+    cube = append_to_cube(file_path, delta, previous['sha256'][:16], fingerprint['sha256'][:16])
+
+    return {
+        'rows': len(delta),
+        'version': fingerprint['sha256'][:16],
+        'frame_cache': frame_cache,
+        'demand_store': demand_store,
+        'partitions': partitions,
+        'cube': cube,
+    }
+
+
+def refit_models_in_background(file_path=DATA_PATH):
+    """
+    Refits the persisted Holt-Winters and Prophet models on the current data
+    version, and brings the saved ARIMA model up to date, in a background
+    thread. Returns the thread.
+    """
+    def refit():
+        # Imported here so appending rows does not need the forecasting libraries
+        from forecast_pipeline import ARIMA_MODEL_PATH, update_arima_model
+        if os.path.exists(ARIMA_MODEL_PATH):
+            update_arima_model(file_path)
+        from forecast_pipeline_holtwinters import get_holtwinters_model
+        get_holtwinters_model(file_path)
+        try:
+            from forecast_pipeline_prophet import get_prophet_model
+        except ImportError:
+            return
+        get_prophet_model(file_path)
+
+    return refit_in_background('forecast-models', refit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new sales rows to the data file.")
+    parser.add_argument('new_rows', help="CSV file with the new rows, same columns as the data file.")
+    parser.add_argument('--data', default=DATA_PATH, help="Data file to append to.")
+    parser.add_argument('--refit', action='store_true', help="Refit the persisted Holt-Winters and Prophet models and update ARIMA afterwards.")
+    args = parser.parse_args()
+
+    try:
+        summary = append_sales(args.new_rows, args.data)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"Appended {summary['rows']:,} rows, data version {summary['version']}.")
+    print(f"Cleaned-data cache: {summary['frame_cache']}")
+    print(f"Demand store: {'updated' if summary['demand_store'] else 'rebuilt on next use'}")
+    print(f"Partitioned dataset: {'updated' if summary['partitions'] else 'rebuilt on next use'}")
+    print(f"Rollup cube: {'updated' if summary['cube'] else 'rebuilt on next use'}")
+
+    if args.refit:
+        print("Refitting forecast models in the background...")
+        refit_models_in_background(args.data).join()
+        print("Forecast models refitted.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# utils/lstm_runtime.py
+
+import numpy as np
+
+_ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'linear': lambda x: x,
+}
+
+
+def lstm_weights(model):
+    """
+    Copies the weights of a Sequential([LSTM, Dense(1)]) Keras model, the
+    architecture train_model.py builds, into plain NumPy arrays.
+
+    Returns None for any other architecture, so callers can fall back to Keras.
+    """
+    layers = getattr(model, 'layers', [])
+    if len(layers) != 2 or type(layers[0]).__name__ != 'LSTM' or type(layers[1]).__name__ != 'Dense':
+        return None
+    lstm, dense = layers
+    lstm_config, dense_config = lstm.get_config(), dense.get_config()
+    if (lstm_config.get('return_sequences') or lstm_config.get('go_backwards') or lstm_config.get('stateful')
+            or not lstm_config.get('use_bias', True) or not dense_config.get('use_bias', True)):
+        return None
+    activations = (lstm_config.get('activation'), lstm_config.get('recurrent_activation'), dense_config.get('activation'))
+    if any(activation not in _ACTIVATIONS for activation in activations):
+        return None
+
+    kernel, recurrent_kernel, bias = [np.asarray(w, dtype=np.float32) for w in lstm.get_weights()]
+    dense_kernel, dense_bias = [np.asarray(w, dtype=np.float32) for w in dense.get_weights()]
+    if kernel.shape[0] != 1 or dense_kernel.shape[1] != 1:
+        return None
+    return {
+        'kernel': kernel,
+        'recurrent_kernel': recurrent_kernel,
+        'bias': bias,
+        'dense_kernel': dense_kernel,
+        'dense_bias': dense_bias,
+        'activation': activations[0],
+        'recurrent_activation': activations[1],
+        'dense_activation': activations[2],
+    }
+
+
+def forecast_windows(weights, windows, days):
+    """
+    Recursive multi-step forecast for many series at once.
+
+    Each step runs the LSTM over the last `window` values from a zero state,
+    exactly like a stateless Keras predict on the sliding window, then
+    feeds the prediction back in. The window is a preallocated ring buffer,
+    so nothing is copied per step, and all series share one batched matrix
+    product per time step.
+
+    Args:
+        weights: Output of lstm_weights.
+        windows: Array of shape (series, window) with the scaled last values.
+        days: Number of steps to forecast.
+
+    Returns:
+        Array of shape (series, days) with the scaled predictions.
+    """
+    activation = _ACTIVATIONS[weights['activation']]
+    recurrent_activation = _ACTIVATIONS[weights['recurrent_activation']]
+    dense_activation = _ACTIVATIONS[weights['dense_activation']]
+    kernel = weights['kernel'][0]
+    recurrent_kernel = weights['recurrent_kernel']
+    bias = weights['bias']
+    dense_kernel = weights['dense_kernel'][:, 0]
+    dense_bias = weights['dense_bias'][0]
+    units = recurrent_kernel.shape[0]
+
+    ring = np.array(windows, dtype=np.float32, copy=True, ndmin=2)
+    n_series, window = ring.shape
+    predictions = np.empty((n_series, days), dtype=np.float32)
+    h = np.empty((n_series, units), dtype=np.float32)
+    c = np.empty((n_series, units), dtype=np.float32)
+    head = 0
+
+    for step in range(days):
+        h[:] = 0
+        c[:] = 0
+        for t in range(window):
+            # Input size is 1, so x @ kernel is an outer product
+            z = ring[:, (head + t) % window, None] * kernel + h @ recurrent_kernel + bias
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c[:] = f * c + i * g
+            h[:] = o * activation(c)
+        prediction = dense_activation(h @ dense_kernel + dense_bias)
+        predictions[:, step] = prediction
+
+        # Overwrite the oldest value, which is where the window now starts
+        ring[:, head] = prediction
+        head = (head + 1) % window
+
+    return predictions
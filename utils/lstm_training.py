@@ -0,0 +1,95 @@
+# utils/lstm_training.py
+
+import math
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.utils import Sequence
+
+
+def sliding_windows(values, window):
+    """
+    Returns (windows, targets) for one series without copying it: windows is a
+    read-only (n - window) x window strided view where row i holds
+    values[i:i + window], and targets[i] is values[i + window].
+    """
+    values = np.asarray(values)
+    windows = np.lib.stride_tricks.sliding_window_view(values[:-1], window)
+    return windows, values[window:]
+
+
+class WindowSequence(Sequence):
+    """
+    Streams (window, next value) training batches from one or more series.
+
+    Only the strided views of each series and a table of (series, row)
+    pairs are held in memory; each batch gathers just its own windows, so
+    memory does not grow with series length x window size. The order is
+    reshuffled after every epoch, like model.fit(shuffle=True) on arrays.
+    """
+
+    def __init__(self, series_list, window, batch_size=16, shuffle=True, seed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.views = [sliding_windows(np.asarray(series, dtype=np.float32), window)
+                      for series in series_list if len(series) > window]
+        if not self.views:
+            raise ValueError(f"Every series is shorter than the window of {window} days.")
+        counts = [len(targets) for _, targets in self.views]
+        self.series_index = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+        self.row_index = np.concatenate([np.arange(count, dtype=np.int64) for count in counts])
+        self.window = window
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(self.row_index))
+        self.rng = np.random.default_rng(seed)
+        if shuffle:
+            self.rng.shuffle(self.order)
+
+    def __len__(self):
+        return math.ceil(len(self.order) / self.batch_size)
+
+    def __getitem__(self, batch):
+        picks = self.order[batch * self.batch_size:(batch + 1) * self.batch_size]
+        series, rows = self.series_index[picks], self.row_index[picks]
+        X = np.empty((len(picks), self.window, 1), dtype=np.float32)
+        y = np.empty((len(picks), 1), dtype=np.float32)
+        for s in np.unique(series):
+            mask = series == s
+            windows, targets = self.views[s]
+            X[mask, :, 0] = windows[rows[mask]]
+            y[mask, 0] = targets[rows[mask]]
+        return X, y
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.order)
+
+
+def train_lstm(series_list, window=10, epochs=30, batch_size=16, units=64, verbose='auto'):
+    """
+    Trains the forecasting LSTM on one or more daily demand series.
+
+    The MinMaxScaler is fitted on all series together, and training batches
+    are streamed by WindowSequence instead of materializing every window.
+    The network and callbacks are the ones train_model.py has always used.
+    verbose is passed to model.fit (0 for silent training, e.g. in backtests).
+
+    Returns:
+        (model, scaler)
+    """
+    scaler = MinMaxScaler()
+    scaler.fit(np.concatenate([np.asarray(series, dtype=np.float64) for series in series_list]).reshape(-1, 1))
+    scaled = [scaler.transform(np.asarray(series, dtype=np.float64).reshape(-1, 1)).ravel() for series in series_list]
+
+    batches = WindowSequence(scaled, window, batch_size=batch_size)
+    model = Sequential([
+        LSTM(units, activation='relu', input_shape=(window, 1)),
+        Dense(1)
+    ])
+    model.compile(optimizer='adam', loss='mse')
+    model.fit(batches, epochs=epochs, verbose=verbose,
+              callbacks=[EarlyStopping(patience=5, restore_best_weights=True)])
+    return model, scaler
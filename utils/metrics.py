@@ -1,5 +1,6 @@
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import numpy as np
+import pandas as pd
 
 def calculate_metrics(true, predicted):
     """
@@ -8,3 +9,89 @@ def calculate_metrics(true, predicted):
     mae = mean_absolute_error(true, predicted)
     rmse = np.sqrt(mean_squared_error(true, predicted))
     return mae, rmse
+
+METRIC_COLUMNS = ['MAE', 'RMSE', 'MAPE', 'sMAPE', 'WAPE', 'MASE', 'Bias']
+
+def mase_scale(history, season=1):
+    """
+    In-sample mean absolute error of the seasonal naive forecast, the MASE denominator.
+    `history` is one 1-D array, or a list of them (one per series, any lengths);
+    returns a float or an array accordingly. NaN where it cannot be computed.
+    """
+    if isinstance(history, (list, tuple)):
+        return np.array([mase_scale(h, season) for h in history], dtype=np.float64)
+    history = np.asarray(history, dtype=np.float64)
+    if len(history) <= season:
+        return np.nan
+    return float(np.nanmean(np.abs(history[season:] - history[:-season])))
+
+def _safe_divide(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, numerator / np.where(denominator != 0, denominator, 1), np.nan)
+
+def evaluate_forecasts(actual, predicted, models=None, series=None, scale=None):
+    """
+    Scores many forecasts at once.
+
+    All metrics are computed in one NumPy pass over a stacked array of shape
+    (model x series x horizon); NaN points (e.g. failed forecasts) are ignored.
+    Zero actuals never divide by zero: MAPE skips them, sMAPE counts a point
+    where actual and forecast are both zero as a perfect forecast, and WAPE
+    and MASE are NaN when their denominator is zero.
+
+    Args:
+        actual: Actual values, broadcastable to predicted, e.g. (series x horizon).
+        predicted: Forecasts of shape (model x series x horizon).
+        models: Model labels, 0..n-1 by default.
+        series: Series labels, 0..n-1 by default.
+        scale: MASE denominator per series (see mase_scale); MASE is NaN without it.
+
+    Returns:
+        A tidy DataFrame with one row per model and series and the columns
+        Model, Series, MAE, RMSE, MAPE, sMAPE, WAPE, MASE and Bias. MAPE,
+        sMAPE and WAPE are percentages; Bias is mean(forecast - actual).
+    """
+    predicted = np.asarray(predicted, dtype=np.float64)
+    if predicted.ndim != 3:
+        raise ValueError(f"predicted must have shape (model, series, horizon), got {predicted.shape}.")
+    actual = np.broadcast_to(np.asarray(actual, dtype=np.float64), predicted.shape)
+    n_models, n_series, _ = predicted.shape
+
+    valid = np.isfinite(actual) & np.isfinite(predicted)
+    error = np.where(valid, predicted - actual, 0)
+    abs_error = np.abs(error)
+    abs_actual = np.where(valid, np.abs(actual), 0)
+    count = valid.sum(axis=2)
+
+    mae = _safe_divide(abs_error.sum(axis=2), count)
+    rmse = np.sqrt(_safe_divide((error ** 2).sum(axis=2), count))
+    bias = _safe_divide(error.sum(axis=2), count)
+
+    nonzero = valid & (abs_actual > 0)
+    mape = _safe_divide(np.where(nonzero, abs_error / np.where(nonzero, abs_actual, 1), 0).sum(axis=2), nonzero.sum(axis=2))
+
+    denominator = abs_actual + np.where(valid, np.abs(predicted), 0)
+    smape_points = np.where(denominator > 0, 2 * abs_error / np.where(denominator > 0, denominator, 1), 0)
+    smape = _safe_divide(smape_points.sum(axis=2), count)
+
+    wape = _safe_divide(abs_error.sum(axis=2), abs_actual.sum(axis=2))
+
+    if scale is None:
+        mase = np.full((n_models, n_series), np.nan)
+    else:
+        scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), (n_series,))
+        mase = _safe_divide(mae, np.where(np.isfinite(scale), scale, 0)[None, :])
+
+    models = list(range(n_models)) if models is None else list(models)
+    series = list(range(n_series)) if series is None else list(series)
+    return pd.DataFrame({
+        'Model': np.repeat(np.asarray(models, dtype=object), n_series),
+        'Series': np.tile(np.asarray(series, dtype=object), n_models),
+        'MAE': mae.ravel(),
+        'RMSE': rmse.ravel(),
+        'MAPE': 100 * mape.ravel(),
+        'sMAPE': 100 * smape.ravel(),
+        'WAPE': 100 * wape.ravel(),
+        'MASE': mase.ravel(),
+        'Bias': bias.ravel(),
+    })
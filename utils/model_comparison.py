@@ -0,0 +1,102 @@
+# utils/model_comparison.py
+
+import multiprocessing
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils.data_loader import DATA_PATH
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODELS = ['ARIMA', 'Prophet', 'Holt-Winters', 'LSTM', 'LightGBM']
+
+
+def _peak_memory_mb():
+    """
+    Peak resident memory of this process in MiB, or None where it is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def forecast_model(model, days, data_path=DATA_PATH):
+    """
+    Runs one model's forecast and returns (forecast frame, actual values).
+
+    The pipelines are imported here, so TensorFlow, Prophet and friends are
+    only loaded in the process that runs that model. Every model is scored
+    against the last `days` values of the daily Units Ordered series; LightGBM
+    is the daily-total model of forecast_daily_lgbm.
+    """
+    if model == 'ARIMA':
+        from forecast_pipeline import predict_future_arima
+        return predict_future_arima(days, return_true=True)
+    if model == 'Prophet':
+        from forecast_pipeline_prophet import predict_future_prophet
+        return predict_future_prophet(days, return_true=True)
+    if model == 'Holt-Winters':
+        from forecast_pipeline_holtwinters import predict_future_holtwinters
+        return predict_future_holtwinters(days, return_true=True)
+    if model == 'LSTM':
+        from forecast_pipeline_lstm import predict_future_lstm
+        return predict_future_lstm(days, return_true=True)
+    if model == 'LightGBM':
+        from forecast_pipeline_lightgbm import forecast_daily_lgbm
+        from utils.demand_store import load_daily_demand
+        daily = load_daily_demand(data_path)
+        # Scored on the same daily Units Ordered values as the others, fitted without them
+        return forecast_daily_lgbm(daily.iloc[:-days], days), daily.to_numpy()[-days:]
+    raise ValueError(f"Unknown model '{model}', expected one of {MODELS}.")
+
+
+def run_model(model, days, data_path=DATA_PATH):
+    """
+    Runs forecast_model and measures it. Errors are returned, not raised, so
+    one failing model does not abort the comparison.
+
+    Returns:
+        A dict with model, forecast, y_true, seconds, peak_memory_mb and error.
+    """
+    start = time.perf_counter()
+    forecast, y_true, error = None, None, None
+    try:
+        forecast, y_true = forecast_model(model, days, data_path)
+        y_true = np.asarray(y_true).ravel()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    return {
+        'model': model,
+        'forecast': forecast,
+        'y_true': y_true,
+        'seconds': time.perf_counter() - start,
+        'peak_memory_mb': _peak_memory_mb(),
+        'error': error,
+    }
+
+
+def compare_models(days, models=None, workers=None, data_path=DATA_PATH):
+    """
+    Runs the forecasts of several models in parallel and yields the run_model
+    result of each one as soon as it finishes.
+
+    Every model runs in a fresh spawned process (one task per child), so the
+    heavy libraries never load into the caller and the peak memory reported
+    belongs to that model alone.
+    """
+    models = models or MODELS
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers or len(models), mp_context=context, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(run_model, model, days, data_path) for model in models]
+        for future in as_completed(futures):
+            yield future.result()
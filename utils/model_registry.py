@@ -0,0 +1,137 @@
+# utils/model_registry.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+
+# Upper bound on the artifacts kept loaded, measured by their size on disk
+DEFAULT_MAX_BYTES = 1024 * 2**20
+
+_models = OrderedDict()
+_lock = threading.Lock()
+# One lock per entry key, held while that artifact loads
+_load_locks = {}
+_max_bytes = DEFAULT_MAX_BYTES
+
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def _evict():
+    """
+    Drops least recently used entries until the loaded artifacts fit the cap.
+    The most recent entry is always kept, even if it alone is over the cap.
+    """
+    total = sum(entry['bytes'] for entry in _models.values())
+    while total > _max_bytes and len(_models) > 1:
+        _, entry = _models.popitem(last=False)
+        total -= entry['bytes']
+
+
+def get_model(paths, loader=joblib.load):
+    """
+    Returns the model loaded from one or more artifact files, loading it once
+    and sharing it with every caller in the process (all Streamlit sessions
+    and pages).
+
+    An entry is reloaded when any of its files changes size or modification
+    time, so retrained models are picked up without a restart.
+
+    Args:
+        paths: An artifact path, or a list of paths that belong together
+            (e.g. a model and its scaler); they are passed to loader in order.
+        loader: Function that loads the artifact(s), joblib.load by default.
+
+    Returns:
+        Whatever loader returns. Callers must treat it as read-only.
+    """
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths)
+    paths = [os.path.abspath(path) for path in paths]
+    key = (f"{loader.__module__}.{loader.__qualname__}", tuple(paths))
+
+    signature = _lookup_signature(key, paths)
+    with _lock:
+        entry = _cached(key, signature)
+        if entry is not None:
+            return entry['model']
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Loading happens outside the registry lock, so a slow load only blocks
+    # callers of the same artifact; they wait here and then find the entry
+    with load_lock:
+        with _lock:
+            entry = _cached(key, signature)
+            if entry is not None:
+                return entry['model']
+        model = loader(*paths)
+        with _lock:
+            _models[key] = {
+                'signature': signature,
+                'model': model,
+                'bytes': sum(size for size, _ in signature),
+            }
+            _models.move_to_end(key)
+            _evict()
+        return model
+
+
+def _lookup_signature(key, paths):
+    try:
+        return _signature(paths)
+    except OSError:
+        with _lock:
+            _models.pop(key, None)
+        raise
+
+
+def _cached(key, signature):
+    """
+    Returns the registry entry of key if its files are unchanged, else None. Call with _lock held.
+    """
+    entry = _models.get(key)
+    if entry is not None and entry['signature'] == signature:
+        _models.move_to_end(key)
+        return entry
+    return None
+
+def artifact_version(paths):
+    """
+    Returns a short identifier of the current artifact file(s), derived from
+    their sizes and modification times; it changes whenever a model is retrained.
+    """
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths)
+    return hashlib.sha256(repr(_signature(paths)).encode()).hexdigest()[:16]
+
+
+def set_max_bytes(max_bytes):
+    """
+    Sets the memory cap of the registry and evicts entries that no longer fit.
+    """
+    global _max_bytes
+    with _lock:
+        _max_bytes = max_bytes
+        _evict()
+
+
+def clear_registry():
+    with _lock:
+        _models.clear()
+
+
+def registry_info():
+    """
+    Lists the loaded artifacts, least recently used first.
+    """
+    with _lock:
+        return [
+            {'paths': list(paths), 'loader': loader, 'bytes': entry['bytes']}
+            for (loader, paths), entry in _models.items()
+        ]
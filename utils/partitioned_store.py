@@ -0,0 +1,149 @@
+# utils/partitioned_store.py
+
+import json
+import os
+import shutil
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from utils.data_cache import cache_dir_for, data_version
+from utils.data_loader import DATA_PATH, load_and_clean_data
+
+DATASET_FORMAT_VERSION = 1
+
+# Hive partition keys derived from Date and Store ID
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string()), ('store', pa.string())]), flavor='hive')
+
+_lock = threading.Lock()
+
+
+def _dataset_dir(file_path):
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir_for(file_path), f"{name}-parts")
+
+
+def _read_meta(dataset_dir):
+    try:
+        with open(os.path.join(dataset_dir, '_meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(dataset_dir, version):
+    with open(os.path.join(dataset_dir, '_meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'format': DATASET_FORMAT_VERSION, 'version': version}, f)
+
+
+def _write_partitions(dataset_dir, df, basename):
+    """
+    Writes cleaned rows into the month=YYYY-MM/store=<Store ID> directories.
+    """
+    df = df.copy(deep=False)
+    df['month'] = df['Date'].dt.strftime('%Y-%m')
+    df['store'] = df['Store ID'].astype(str)
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        dataset_dir,
+        format='parquet',
+        partitioning=PARTITIONING,
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+
+
+def build_partitioned_dataset(file_path=DATA_PATH, version=None):
+    """
+    Rewrites the cleaned data as a Parquet dataset partitioned by month and Store ID.
+    """
+    version = version or data_version(file_path)
+    dataset_dir = _dataset_dir(file_path)
+    tmp_dir = f"{dataset_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    df = load_and_clean_data(file_path)
+    _write_partitions(tmp_dir, df, f"part-{version}")
+    _write_meta(tmp_dir, version)
+
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    os.replace(tmp_dir, dataset_dir)
+    return dataset_dir
+
+
+def append_to_partitioned_dataset(file_path, delta, previous_version, version):
+    """
+    Writes freshly appended, cleaned rows into their partitions as new files.
+    Returns False when there is no dataset for previous_version to extend.
+    """
+    dataset_dir = _dataset_dir(file_path)
+    with _lock:
+        meta = _read_meta(dataset_dir)
+        if meta.get('format') != DATASET_FORMAT_VERSION or meta.get('version') != previous_version:
+            return False
+        _write_partitions(dataset_dir, delta, f"part-{version}")
+        _write_meta(dataset_dir, version)
+    return True
+
+
+def get_partitioned_dataset(file_path=DATA_PATH):
+    """
+    Returns the pyarrow dataset for the current data version, building it if needed.
+    """
+    version = data_version(file_path)
+    dataset_dir = _dataset_dir(file_path)
+    with _lock:
+        meta = _read_meta(dataset_dir)
+        if meta.get('format') != DATASET_FORMAT_VERSION or meta.get('version') != version:
+            build_partitioned_dataset(file_path, version)
+    return ds.dataset(dataset_dir, format='parquet', partitioning=PARTITIONING)
+
+
+def load_sales_partitions(file_path=DATA_PATH, start_date=None, end_date=None, regions=None, stores=None, columns=None):
+    """
+    Loads the cleaned rows matching a date range, regions and stores.
+
+    The month and store filters prune whole partition directories before any
+    file is opened; the Region and exact-date filters are pushed down into the
+    Parquet scan, so row groups that cannot match are skipped.
+
+    Args:
+        file_path: Path to the sales CSV.
+        start_date, end_date: Inclusive date bounds, or None for open-ended.
+        regions: Regions to keep, or None for all.
+        stores: Store IDs to keep, or None for all.
+        columns: Columns to read, or None for all.
+
+    Returns:
+        A DataFrame with the same columns and dtypes as load_and_clean_data, sorted by Date.
+    """
+    dataset = get_partitioned_dataset(file_path)
+
+    conditions = []
+    if start_date is not None:
+        start_date = pd.Timestamp(start_date)
+        conditions.append(ds.field('month') >= start_date.strftime('%Y-%m'))
+        conditions.append(ds.field('Date') >= pa.scalar(start_date, type=dataset.schema.field('Date').type))
+    if end_date is not None:
+        end_date = pd.Timestamp(end_date)
+        conditions.append(ds.field('month') <= end_date.strftime('%Y-%m'))
+        conditions.append(ds.field('Date') <= pa.scalar(end_date, type=dataset.schema.field('Date').type))
+    if stores is not None:
+        conditions.append(ds.field('store').isin([str(store) for store in stores]))
+    if regions is not None:
+        conditions.append(ds.field('Region').isin([str(region) for region in regions]))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    if columns is not None and 'Date' not in columns:
+        columns = ['Date'] + list(columns)
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas()
+    df = df.drop(columns=[col for col in ('month', 'store') if col in df.columns])
+    df.sort_values('Date', kind='stable', inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return df
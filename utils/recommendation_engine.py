@@ -1,9 +1,24 @@
 # utils/recommendation_engine.py
 
+import os
+import threading
+
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import calendar
 
+from utils.data_cache import data_version
+from utils.data_loader import DATA_PATH, load_and_clean_data
+
+# Products kept per season; the seasonal rule lists three, the previous-season rule one
+TOP_K = 3
+# Days of the regional sales-spike rule
+REGIONAL_WINDOW_DAYS = 30
+
+_indexes = {}
+_lock = threading.Lock()
+
 def get_season(month: int) -> str:
     """Returns the season based on the month."""
     if month in [3, 4, 5]:
@@ -15,69 +30,152 @@ def get_season(month: int) -> str:
     else:
         return 'Winter'
 
-def smart_recommendations(df: pd.DataFrame, current_date: datetime) -> list:
+# Season of months 1..12, looked up for whole columns at once
+MONTH_SEASONS = np.array([get_season(month) for month in range(1, 13)], dtype=object)
+
+def _as_groupby_sum(totals, dtype):
     """
-    Generates smart recommendations based on historical seasonal trends.
-    
-    Args:
-        df: The cleaned sales data DataFrame.
-        current_date: The date to base the recommendations on.
-    
+    Casts totals to the dtype groupby().sum() gives them: the column's own
+    integer dtype when they fit in it. Sorting breaks ties by dtype, so the
+    ranked products match the row-level computation exactly.
+    """
+    if np.issubdtype(dtype, np.integer) and len(totals) and np.iinfo(dtype).min <= totals.min() and totals.max() <= np.iinfo(dtype).max:
+        return totals.astype(dtype)
+    return totals
+
+def _seasons(df, dates):
+    if 'Seasonality' in df.columns:
+        return df['Seasonality']
+    return pd.Series(MONTH_SEASONS[dates.dt.month.to_numpy() - 1], index=df.index)
+
+def build_recommendation_index(df: pd.DataFrame) -> dict:
+    """
+    Precomputes everything smart_recommendations() needs from the sales rows,
+    without modifying the DataFrame.
+
     Returns:
-        A list of recommendation strings.
+        A dict with 'seasons' (season -> top TOP_K (product, category) pairs by
+        units sold), and for the regional rule 'dates' (sorted unique dates),
+        'pairs' (Region x Product ID in groupby order), 'cell_keys' and
+        'cell_totals'. There is one cell per pair and date with sales rows,
+        sorted by pair then date: its key is pair * (len(dates) + 1) + date
+        position, and its total is the pair's units sold from that date on.
+
+        Memory grows with the number of pair x date cells that have rows
+        (at most the number of rows), not with the full pairs x dates grid.
     """
-    if 'Date' not in df.columns:
-        return ["Error: 'Date' column not found in data."]
-    
-    df['Date'] = pd.to_datetime(df['Date'])
-    df['Month'] = df['Date'].dt.month
-    
-    # Check if 'Seasonality' column exists, if not, create it
-    if 'Seasonality' not in df.columns:
-        df['Seasonality'] = df['Month'].apply(get_season)
+    dates = pd.to_datetime(df['Date'])
+    seasons = _seasons(df, dates)
+    index = {'seasons': {}, 'dates': None}
+
+    season_sales = df['Units Sold'].groupby([seasons, df['Product ID']], observed=True).sum()
+    if 'Category' in df.columns:
+        first_rows = pd.DataFrame({'Season': seasons, 'Product ID': df['Product ID'], 'Category': df['Category']})
+        first_rows = first_rows.drop_duplicates(['Season', 'Product ID'])
+        categories = dict(zip(zip(first_rows['Season'], first_rows['Product ID']), first_rows['Category']))
+    else:
+        categories = {}
+    for season in season_sales.index.get_level_values(0).unique():
+        top = _as_groupby_sum(season_sales.xs(season, level=0), df['Units Sold'].dtype).sort_values(ascending=False).head(TOP_K)
+        index['seasons'][season] = [(product_id, categories.get((season, product_id), "N/A")) for product_id in top.index]
 
+    if 'Region' in df.columns:
+        # Units sold of every Region x Product ID pair on each day it has rows
+        valid = dates.notna().to_numpy()
+        groups = df.groupby(['Region', 'Product ID'], observed=True)
+        pair_codes = groups.ngroup().to_numpy()
+        valid &= pair_codes >= 0
+        unique_dates = pd.DatetimeIndex(np.unique(dates.to_numpy()[valid]))
+        row_keys = pair_codes[valid].astype(np.int64) * (len(unique_dates) + 1) + unique_dates.searchsorted(dates.to_numpy()[valid])
+        cell_keys, cells = np.unique(row_keys, return_inverse=True)
+        units = df['Units Sold'].to_numpy()[valid]
+        daily = np.bincount(cells, weights=units, minlength=len(cell_keys))
+        if np.issubdtype(units.dtype, np.integer):
+            daily = np.rint(daily).astype(np.int64)
+
+        # Suffix sums within each pair: the pair's total minus what came before the cell
+        cumulative = np.concatenate([[0], np.cumsum(daily)])
+        cell_pairs = cell_keys // (len(unique_dates) + 1)
+        pair_ends = np.searchsorted(cell_pairs, np.arange(groups.ngroups), side='right')
+        index['units_dtype'] = units.dtype
+        index['dates'] = unique_dates
+        index['pairs'] = groups.size().index.to_frame(index=False)
+        index['cell_keys'] = cell_keys
+        index['cell_totals'] = cumulative[pair_ends[cell_pairs]] - cumulative[:-1]
+    return index
+
+def get_recommendation_index(file_path=DATA_PATH) -> dict:
+    """
+    Returns the recommendation index of the current data version, building it
+    once per version and sharing it across callers in the process.
+    """
+    version = data_version(file_path)
+    cache_key = (os.path.abspath(file_path), version)
+    with _lock:
+        if cache_key in _indexes:
+            return _indexes[cache_key]
+        index = build_recommendation_index(load_and_clean_data(file_path))
+        for key in [key for key in _indexes if key[0] == cache_key[0]]:
+            del _indexes[key]
+        _indexes[cache_key] = index
+        return index
+
+def recommend_from_index(index: dict, current_date: datetime) -> list:
+    """
+    Generates the smart_recommendations() output for a date from a
+    recommendation index, without touching the sales rows.
+    """
     recommendations = []
     
     current_season = get_season(current_date.month)
 
     # --- Rule 1: High-demand products in the current season ---
-    seasonal_data = df[df['Seasonality'] == current_season]
-    if not seasonal_data.empty:
-        seasonal_sales = seasonal_data.groupby('Product ID')['Units Sold'].sum().sort_values(ascending=False).reset_index()
-        
-        if not seasonal_sales.empty:
-            top_products = seasonal_sales.head(3)
-            for _, row in top_products.iterrows():
-                product_id = row['Product ID']
-                # Try to get the category, handle potential key errors
-                try:
-                    product_category = seasonal_data[seasonal_data['Product ID'] == product_id]['Category'].iloc[0]
-                except KeyError:
-                    product_category = "N/A"
-                recommendations.append(f"Product '{product_id}' (Category: {product_category}) historically performs well in the {current_season} season. Consider increasing inventory or running a targeted promotion.")
+    for product_id, product_category in index['seasons'].get(current_season, []):
+        recommendations.append(f"Product '{product_id}' (Category: {product_category}) historically performs well in the {current_season} season. Consider increasing inventory or running a targeted promotion.")
 
     # --- Rule 2: Products with recent sales spikes in other regions ---
-    if 'Region' in df.columns:
-        recent_data = df[df['Date'] >= current_date - pd.Timedelta(days=30)]
-        if not recent_data.empty:
-            regional_sales = recent_data.groupby(['Region', 'Product ID'])['Units Sold'].sum().reset_index()
-            
-            if not regional_sales.empty:
-                top_regional_product = regional_sales.sort_values('Units Sold', ascending=False).iloc[0]
-                recommendations.append(f"Product '{top_regional_product['Product ID']}' is showing a significant sales spike in the '{top_regional_product['Region']}' region. This could be a market opportunity for other regions.")
+    if index['dates'] is not None and len(index['cell_keys']):
+        # Every row from the cutoff onwards counts, later dates included
+        start = index['dates'].searchsorted(current_date - pd.Timedelta(days=REGIONAL_WINDOW_DAYS), side='left')
+        # First cell of each pair on or after the cutoff; a pair has recent rows if that cell is its own
+        pair_codes = np.arange(len(index['pairs']), dtype=np.int64)
+        positions = np.searchsorted(index['cell_keys'], pair_codes * (len(index['dates']) + 1) + start)
+        found = np.minimum(positions, len(index['cell_keys']) - 1)
+        present = (positions < len(index['cell_keys'])) & (index['cell_keys'][found] // (len(index['dates']) + 1) == pair_codes)
+        if present.any():
+            regional_sales = index['pairs'][present].reset_index(drop=True)
+            regional_sales['Units Sold'] = _as_groupby_sum(index['cell_totals'][positions[present]], index['units_dtype'])
+            top_regional_product = regional_sales.sort_values('Units Sold', ascending=False).iloc[0]
+            recommendations.append(f"Product '{top_regional_product['Product ID']}' is showing a significant sales spike in the '{top_regional_product['Region']}' region. This could be a market opportunity for other regions.")
             
     # --- Rule 3: Products popular in the previous season ---
     previous_month = (current_date.month - 2) % 12 + 1 if current_date.month > 1 else 12
     previous_season = get_season(previous_month)
     
-    previous_season_data = df[df['Seasonality'] == previous_season]
-    if not previous_season_data.empty:
-        sales_in_previous_season = previous_season_data.groupby('Product ID')['Units Sold'].sum().sort_values(ascending=False).head(1).reset_index()
-        if not sales_in_previous_season.empty:
-            product_id = sales_in_previous_season['Product ID'].iloc[0]
-            recommendations.append(f"Product '{product_id}' was a top seller last season. Consider running a clearance sale to manage inventory before it becomes 'dead stock'.")
+    previous_top = index['seasons'].get(previous_season)
+    if previous_top:
+        product_id = previous_top[0][0]
+        recommendations.append(f"Product '{product_id}' was a top seller last season. Consider running a clearance sale to manage inventory before it becomes 'dead stock'.")
     
     if not recommendations:
         return ["No specific recommendations were found based on the provided data for this season. Please check your data or try a different date."]
     
-    return recommendations
\ No newline at end of file
+    return recommendations
+
+def smart_recommendations(df: pd.DataFrame, current_date: datetime) -> list:
+    """
+    Generates smart recommendations based on historical seasonal trends.
+    The DataFrame is not modified; use get_recommendation_index() and
+    recommend_from_index() to answer many dates from the data file.
+    
+    Args:
+        df: The cleaned sales data DataFrame.
+        current_date: The date to base the recommendations on.
+    
+    Returns:
+        A list of recommendation strings.
+    """
+    if 'Date' not in df.columns:
+        return ["Error: 'Date' column not found in data."]
+
+    return recommend_from_index(build_recommendation_index(df), current_date)
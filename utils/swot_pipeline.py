@@ -5,17 +5,47 @@ import numpy as np
 from datetime import timedelta
 import streamlit as st
 
+def product_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the per-product table the SWOT rules read from, in one pass over the rows.
+
+    Indexed by Product ID in groupby order, with the total 'Units Sold' and
+    'Units Ordered', the 'Last Position' (row number of the product's last
+    row) and that row's 'Last Units Sold' and 'Last Inventory' (if the
+    column exists).
+    """
+    grouped = df.groupby('Product ID', observed=True)
+    stats = pd.DataFrame({
+        'Units Sold': grouped['Units Sold'].sum(),
+        'Units Ordered': grouped['Units Ordered'].sum(),
+    })
+
+    last_positions = np.flatnonzero(~df['Product ID'].duplicated(keep='last').to_numpy())
+    last_rows = df.iloc[last_positions]
+    # Row of each product's last occurrence, in the order of the stats index
+    take = pd.Index(last_rows['Product ID'].to_numpy()).get_indexer(stats.index)
+    stats['Last Position'] = last_positions[take]
+    stats['Last Units Sold'] = last_rows['Units Sold'].to_numpy()[take]
+    if 'Inventory Level' in df.columns:
+        stats['Last Inventory'] = last_rows['Inventory Level'].to_numpy()[take]
+    return stats
+
 def generate_swot_from_data(df: pd.DataFrame) -> dict:
     """
     Generates a SWOT analysis from sales data based on predefined rules.
     This version analyzes the entire dataset with dynamic thresholds based on the data itself.
+    The product rules are vectorized masks over one product_stats() table, so the
+    cost grows linearly with the number of rows.
     """
-    full_data = df.copy()
+    full_data = df
+    stats = product_stats(full_data)
+    has_inventory = 'Inventory Level' in full_data.columns
     
     historic_volatility = full_data['Units Ordered'].var()
     sales_growth_rate = 0.15 
-    top_category_sales = full_data.groupby('Category')['Units Sold'].sum().max()
-    avg_category_sales = full_data.groupby('Category')['Units Sold'].sum().mean()
+    category_sales = full_data.groupby('Category', observed=True)['Units Sold'].sum()
+    top_category_sales = category_sales.max()
+    avg_category_sales = category_sales.mean()
     forecasted_drop = 0.10
     
     swot = {
@@ -26,8 +56,8 @@ def generate_swot_from_data(df: pd.DataFrame) -> dict:
     }
     
     # Calculate median for sales and stock data for dynamic rules
-    median_product_sales = full_data.groupby('Product ID')['Units Sold'].sum().median()
-    median_stock_level = full_data['Inventory Level'].median() if 'Inventory Level' in full_data.columns else 0
+    median_product_sales = stats['Units Sold'].median()
+    median_stock_level = full_data['Inventory Level'].median() if has_inventory else 0
     
     # --- Strengths ---
     if not full_data.empty:
@@ -44,45 +74,41 @@ def generate_swot_from_data(df: pd.DataFrame) -> dict:
             swot['Strengths'].append("A particular product category has consistently outperformed others, a sign of its popularity.")
             
         # Rule 4: High-demand products with sufficient stock
-        high_demand_products = full_data.groupby('Product ID')['Units Ordered'].sum()
-        high_demand_products = high_demand_products[high_demand_products > high_demand_products.median() * 1.5]
-        if not high_demand_products.empty:
-            for product_id in high_demand_products.index:
-                if 'Inventory Level' in full_data.columns:
-                    recent_stock = full_data[full_data['Product ID'] == product_id]['Inventory Level'].iloc[-1]
-                    if recent_stock > high_demand_products[product_id]: 
-                        swot['Strengths'].append(f"Inventory for high-demand product '{product_id}' is sufficient, ensuring no lost sales.")
+        if has_inventory:
+            ordered = stats['Units Ordered']
+            sufficient = (ordered > ordered.median() * 1.5) & (stats['Last Inventory'] > ordered)
+            for product_id in stats.index[sufficient.to_numpy()]:
+                swot['Strengths'].append(f"Inventory for high-demand product '{product_id}' is sufficient, ensuring no lost sales.")
                         
     # --- Weaknesses ---
     if not full_data.empty:
         # Rule 1: High demand volatility
-        demand_volatility = full_data['Units Ordered'].var()
+        # The same variance as historic_volatility, so it is not recomputed
+        demand_volatility = historic_volatility
         if demand_volatility > historic_volatility * 1.5: 
             swot['Weaknesses'].append("There is a high volatility in demand, making sales difficult to predict.")
 
         # Rule 2: Low-performing products
-        low_sales_products = full_data.groupby('Product ID')['Units Sold'].sum()
-        low_sales_products = low_sales_products[low_sales_products < median_product_sales * 0.50]
-        if not low_sales_products.empty:
-            low_sales_product_ids = [str(pid) for pid in low_sales_products.index.tolist()]
+        low_sales_products = stats.index[(stats['Units Sold'] < median_product_sales * 0.50).to_numpy()]
+        if len(low_sales_products) > 0:
+            low_sales_product_ids = [str(pid) for pid in low_sales_products.tolist()]
             swot['Weaknesses'].append(f"Some products like {', '.join(low_sales_product_ids)} are showing very low historical sales.")
 
         # Rule 3: Dead stock
-        if 'Inventory Level' in full_data.columns:
-            dead_stock_df = full_data.drop_duplicates('Product ID', keep='last')
-            dead_stock = dead_stock_df[(dead_stock_df['Inventory Level'] > median_stock_level * 1.5) & (dead_stock_df['Units Sold'] < median_product_sales * 0.25)]
+        if has_inventory:
+            # Judged on each product's last row, listed in the order of those rows
+            dead_stock = stats[(stats['Last Inventory'] > median_stock_level * 1.5) & (stats['Last Units Sold'] < median_product_sales * 0.25)]
             if not dead_stock.empty:
-                dead_stock_ids = [str(pid) for pid in dead_stock['Product ID'].tolist()]
+                dead_stock_ids = [str(pid) for pid in dead_stock.sort_values('Last Position').index.tolist()]
                 swot['Weaknesses'].append(f"There is significant 'dead stock' for products such as {', '.join(dead_stock_ids)} which are not selling well.")
         # --- Opportunities ---
     if not full_data.empty:
         opportunities = []
 
         # Rule: High Potential Products
-        high_potential_products = full_data.groupby('Product ID')['Units Sold'].sum()
-        high_potential_products = high_potential_products[high_potential_products > median_product_sales * 0.5]
-        if not high_potential_products.empty:
-            high_potential_ids = [str(pid) for pid in high_potential_products.index.tolist()]
+        high_potential_products = stats.index[(stats['Units Sold'] > median_product_sales * 0.5).to_numpy()]
+        if len(high_potential_products) > 0:
+            high_potential_ids = [str(pid) for pid in high_potential_products.tolist()]
             opportunities.append({
                 "type": "product",
                 "message": f"📦 منتجات ذات أداء قوي: {', '.join(high_potential_ids)} تمثل فرصة لتعزيز التسويق والاستثمار."
@@ -90,7 +116,7 @@ def generate_swot_from_data(df: pd.DataFrame) -> dict:
 
         # Rule: Seasonality Opportunity
         if 'Seasonality' in full_data.columns and 'Units Sold' in full_data.columns:
-            seasonal_sales = full_data.groupby('Seasonality')['Units Sold'].sum()
+            seasonal_sales = full_data.groupby('Seasonality', observed=True)['Units Sold'].sum()
             avg_sales = seasonal_sales.mean()
             strong_seasons = seasonal_sales[seasonal_sales > avg_sales * 0.4]
             if not strong_seasons.empty:
@@ -122,13 +148,13 @@ def generate_swot_from_data(df: pd.DataFrame) -> dict:
                 swot['Threats'].append("A significant drop in sales was observed after a recent promotion, indicating over-reliance on discounts.")
 
     # Rule 3: Excess inventory for products with dropping demand
-    if 'Demand Forecast' in full_data.columns and 'Inventory Level' in full_data.columns:
-        low_forecast_products = full_data[full_data['Demand Forecast'] < full_data['Units Ordered'].median()]['Product ID'].unique()
-        if len(low_forecast_products) > 0:
-            for product_id in low_forecast_products:
-                recent_stock = full_data[full_data['Product ID'] == product_id]['Inventory Level'].iloc[-1]
-                if recent_stock > median_stock_level * 1.5: 
-                    swot['Threats'].append(f"Excess inventory ({recent_stock} units) for product '{product_id}' poses a risk due to forecasted low demand.")
+    if 'Demand Forecast' in full_data.columns and has_inventory:
+        # Products in the order their first low-forecast row appears
+        low_forecast = full_data['Demand Forecast'] < full_data['Units Ordered'].median()
+        low_forecast_products = full_data.loc[low_forecast, 'Product ID'].drop_duplicates().to_numpy()
+        recent_stock = stats['Last Inventory'].reindex(low_forecast_products)
+        for product_id, stock in recent_stock[recent_stock > median_stock_level * 1.5].items():
+            swot['Threats'].append(f"Excess inventory ({stock} units) for product '{product_id}' poses a risk due to forecasted low demand.")
     
     for key in swot:
         if not swot[key]: